@@ -3,14 +3,16 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import Schema, fields, validate, ValidationError
 from werkzeug.utils import secure_filename
 import os
+import redis
 from datetime import datetime, timedelta
 import uuid
 
 from app.models.db import db
 from app.models.user import User
 from app.models.conversion import Conversion, SharedConversion, Webhook
-from app.converters.converter_factory import ConverterFactory
+from app.converters.converter_factory import ConverterFactory, get_cached_converter
 from app.converters.base_converter import BaseConverter
+from app.utils.limits import incr_daily
 from app.utils.file_utils import (
     allowed_file, 
     get_file_extension, 
@@ -27,6 +29,14 @@ api_bp = Blueprint('api', __name__)
 # Register sub-blueprints
 api_bp.register_blueprint(templates_bp, url_prefix='/templates')
 
+def _count_towards_daily_limit(user_id, conversion_id):
+    """Record a newly created conversion in the user's daily limit window"""
+    try:
+        incr_daily(user_id, conversion_id)
+    except redis.RedisError as e:
+        # Limit checks fall back to the database while Redis is unreachable
+        current_app.logger.warning(f"Could not update daily counter for user {user_id}: {str(e)}")
+
 # Schemas for request validation
 class ConversionSchema(Schema):
     target_format = fields.String(required=True)
@@ -91,14 +101,12 @@ def upload_file():
         return jsonify({"error": "Could not determine file format"}), 400
     
     # Check if format is allowed
-    allowed_extensions = []
-    for ext_list in current_app.config['ALLOWED_EXTENSIONS'].values():
-        allowed_extensions.extend(ext_list)
+    allowed_extensions = current_app.config['ALLOWED_EXTENSIONS']
     
     if not allowed_file(file.filename, allowed_extensions):
         return jsonify({
             "error": "File format not allowed",
-            "allowed_formats": list(current_app.config['ALLOWED_EXTENSIONS'].keys())
+            "allowed_formats": sorted(allowed_extensions)
         }), 400
     
     # Check file size
@@ -164,6 +172,8 @@ def upload_file():
     conversion.set_expiry()
     
     db.session.add(conversion)
+    db.session.flush()
+    _count_towards_daily_limit(current_user_id, conversion.id)
     db.session.commit()
     
     # Add webhook if provided
@@ -191,7 +201,7 @@ def upload_file():
         db.session.commit()
         
         # Get converter instance
-        converter = ConverterFactory.get_converter(source_format, target_format)
+        converter = get_cached_converter(source_format, target_format)
         
         # Convert the file
         success, error = converter.safe_convert(upload_path, target_path, data.get('options'))
@@ -493,6 +503,7 @@ def batch_upload():
         return jsonify({"error": "Validation error", "details": err.messages}), 400
     
     target_format = data['target_format'].lower()
+    allowed_extensions = current_app.config['ALLOWED_EXTENSIONS']
     
     # Process each file
     conversions = []
@@ -507,10 +518,6 @@ def batch_upload():
             continue
         
         # Check if format is allowed
-        allowed_extensions = []
-        for ext_list in current_app.config['ALLOWED_EXTENSIONS'].values():
-            allowed_extensions.extend(ext_list)
-        
         if not allowed_file(file.filename, allowed_extensions):
             continue
         
@@ -563,6 +570,8 @@ def batch_upload():
         conversion.set_expiry()
         
         db.session.add(conversion)
+        db.session.flush()
+        _count_towards_daily_limit(current_user_id, conversion.id)
         db.session.commit()
         
         # Add webhook if provided
@@ -28,7 +28,7 @@ class Config:
     # File storage settings
     STORAGE_TYPE = os.environ.get('STORAGE_TYPE', 'local')
     UPLOAD_DIR = os.environ.get('UPLOAD_DIR', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads'))
-    ALLOWED_EXTENSIONS = {
+    ALLOWED_EXTENSIONS = frozenset({
         # Document formats
         'csv', 'json', 'xml', 'yaml', 'yml', 'xlsx', 'xls', 'pdf', 'docx', 'txt', 'html',
         # Image formats
@@ -37,7 +37,7 @@ class Config:
         'mp3', 'wav', 'ogg', 'flac', 'aac', 'm4a', 'opus',
         # Video formats
         'mp4', 'avi', 'mov', 'mkv', 'webm', 'wmv', 'flv', '3gp',
-    }
+    })
     MAX_CONTENT_LENGTH = 100 * 1024 * 1024  # 100 MB limit for uploads
     TEMP_FILE_EXPIRY = 48  # Hours before temporary files are deleted
     
@@ -45,6 +45,9 @@ class Config:
     CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
     CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
     
+    # Redis settings (shares the Celery broker instance unless overridden)
+    REDIS_URL = os.environ.get('REDIS_URL', CELERY_BROKER_URL)
+    
     # External API connections
     FFMPEG_PATH = os.environ.get('FFMPEG_PATH', 'ffmpeg')
     
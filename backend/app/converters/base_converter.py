@@ -1,4 +1,6 @@
 import os
+import io
+import csv
 import time
 import logging
 import hashlib
@@ -7,6 +9,8 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, Tuple, Optional, List
 from flask import current_app
 from functools import wraps
+from contextlib import contextmanager
+from xml.sax.saxutils import escape
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -170,6 +174,195 @@ class BaseConverter(ABC):
         
         return file_hash
     
+    def _rows_to_dataframe(self, rows):
+        """
+        Build a DataFrame from row dicts with explicitly precomputed columns
+        
+        Args:
+            rows (list): Rows to tabulate, usually dicts
+        
+        Returns:
+            DataFrame: One row per item, columns in first-seen key order
+        """
+        import pandas as pd
+        
+        if not all(isinstance(row, dict) for row in rows):
+            return pd.DataFrame(rows)
+        
+        # Ordered union of keys across rows (dict preserves insertion order)
+        columns = list({key: None for row in rows for key in row})
+        return pd.DataFrame.from_records(rows, columns=columns)
+    
+    def _write_csv(self, df, target_path: str, options: Dict[str, Any]) -> None:
+        """
+        Write a DataFrame as CSV, using pyarrow's C++ writer when the output
+        would be identical to pandas'
+        
+        Args:
+            df (DataFrame): Data to write
+            target_path (str): Path where the CSV file should be saved
+            options (dict): Conversion options; 'csv_options' go to DataFrame.to_csv
+        """
+        csv_options = options.get('csv_options', {})
+        
+        # Arrow formats floats, booleans and dates differently from pandas and
+        # quotes every string, so the fast path is limited to all-integer frames
+        # without pandas-specific csv_options
+        if not csv_options and len(df.columns) and all(dtype.kind in 'iu' for dtype in df.dtypes):
+            try:
+                import pyarrow as pa
+                from pyarrow import csv as pa_csv
+            except ImportError:
+                pa = None
+            
+            if pa is not None:
+                try:
+                    table = pa.Table.from_pandas(df, preserve_index=False)
+                except (ValueError, pa.ArrowException):
+                    # e.g. duplicate column names
+                    table = None
+                
+                if table is not None:
+                    # Arrow always quotes the header, so write it the way pandas does
+                    header = io.StringIO()
+                    csv.writer(header, lineterminator='\n').writerow(df.columns)
+                    with open(target_path, 'wb') as f:
+                        f.write(header.getvalue().encode('utf-8'))
+                        pa_csv.write_csv(table, f, pa_csv.WriteOptions(include_header=False))
+                    return
+        
+        df.to_csv(target_path, index=False, **csv_options)
+    
+    @contextmanager
+    def _excel_writer(self, target_path: str):
+        """
+        Open an ExcelWriter for target_path, closing it on exit
+        
+        xlsxwriter is used when installed, as it writes faster than openpyxl.
+        Its constant-memory mode is not enabled: to_excel writes cell by cell
+        column-wise, and that mode drops writes to rows it has already flushed.
+        If writing fails, the partial file is removed.
+        
+        Args:
+            target_path (str): Path where the Excel file should be saved
+            
+        Yields:
+            ExcelWriter: Writer for the target file
+        """
+        import pandas as pd
+        
+        try:
+            writer = pd.ExcelWriter(target_path, engine='xlsxwriter')
+        except ImportError:
+            writer = pd.ExcelWriter(target_path, engine='openpyxl')
+        
+        try:
+            yield writer
+        except BaseException:
+            # Closing still releases the file handle; saving an incomplete
+            # workbook may fail too, but the original error is the one to report
+            try:
+                writer.close()
+            except Exception:
+                pass
+            try:
+                os.unlink(target_path)
+            except OSError:
+                pass
+            raise
+        writer.close()
+    
+    def _write_dataframe_pdf(self, df, target_path: str, title: str) -> None:
+        """
+        Write a DataFrame as a PDF table under a title
+        
+        Uses reportlab when installed and falls back to FPDF otherwise.
+        
+        Args:
+            df (DataFrame): Data to render
+            target_path (str): Path where the PDF file should be saved
+            title (str): Document title
+        """
+        # Prefer reportlab's Table flowable, which lays out the table in a single pass
+        try:
+            from reportlab.lib import colors
+            from reportlab.lib.enums import TA_CENTER
+            from reportlab.lib.pagesizes import A4
+            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+        except ImportError:
+            self._write_pdf_with_fpdf(df, target_path, title)
+            return
+        
+        styles = getSampleStyleSheet()
+        header_style = ParagraphStyle(
+            'TableHeader', parent=styles['BodyText'],
+            fontName='Helvetica-Bold', fontSize=12, leading=14, alignment=TA_CENTER
+        )
+        cell_style = ParagraphStyle(
+            'TableCell', parent=styles['BodyText'],
+            fontSize=10, leading=12, alignment=TA_CENTER
+        )
+        
+        # Header row followed by cell text truncated to 30 characters; cells are
+        # paragraphs so long values wrap inside their column
+        cells = df.astype(str).apply(lambda column: column.str.slice(0, 30))
+        table_data = [[Paragraph(escape(str(col)), header_style) for col in df.columns]]
+        table_data.extend(
+            [Paragraph(escape(value), cell_style) for value in row]
+            for row in cells.values.tolist()
+        )
+        
+        # Split the page width evenly between the columns, as the FPDF fallback does
+        doc = SimpleDocTemplate(target_path, pagesize=A4)
+        col_count = len(df.columns)
+        table = Table(table_data, colWidths=[doc.width / col_count] * col_count, repeatRows=1)
+        table.setStyle(TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ]))
+        
+        doc.build([Paragraph(escape(title), styles['Title']), Spacer(1, 10), table])
+    
+    def _write_pdf_with_fpdf(self, df, target_path, title):
+        """Write a DataFrame as a PDF table using FPDF"""
+        # Import optional dependencies here to avoid forcing all users to install them
+        try:
+            from fpdf import FPDF
+        except ImportError:
+            raise ImportError("Converting to PDF requires the 'reportlab' or 'fpdf' package. Install one using 'pip install reportlab'.")
+        
+        # Create PDF object
+        pdf = FPDF()
+        pdf.add_page()
+        
+        # Document title
+        pdf.set_font('Arial', 'B', 16)
+        pdf.cell(0, 10, title, 0, 1, 'C')
+        pdf.ln(10)
+        
+        # Set up table
+        pdf.set_font('Arial', 'B', 12)
+        
+        # Calculate column width (based on number of columns)
+        columns = df.columns
+        col_width = (pdf.w - 20) / len(columns)
+        
+        # Add headers
+        for col in columns:
+            pdf.cell(col_width, 10, str(col), 1, 0, 'C')
+        pdf.ln()
+        
+        # Add data
+        pdf.set_font('Arial', '', 10)
+        for _, row in df.iterrows():
+            for col in columns:
+                pdf.cell(col_width, 10, str(row[col])[:30], 1, 0, 'C')
+            pdf.ln()
+        
+        # Save PDF file
+        pdf.output(target_path)
+    
     def safe_convert(self, source_path: str, target_path: str, options: Optional[Dict[str, Any]] = None) -> Tuple[bool, Optional[str]]:
         """
         Safely convert the file, catching and logging any exceptions
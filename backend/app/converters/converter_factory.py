@@ -103,6 +103,9 @@ class ConverterFactory:
             self._conversion_graph[source_format] = set()
         self._conversion_graph[source_format].add(target_format)
         
+        # Cached converters may now resolve differently
+        get_cached_converter.cache_clear()
+        
         logger.debug(f"Registered converter for {source_format} -> {target_format}")
     
     def _build_conversion_graph(self) -> None:
@@ -363,6 +366,7 @@ class ConverterFactory:
         self._converters = {}
         self._converter_classes = {}
         self._conversion_graph = {}
+        get_cached_converter.cache_clear()
         
     def reinitialize(self) -> None:
         """
@@ -371,5 +375,22 @@ class ConverterFactory:
         self.clear_converters()
         self._initialize()
 
+@lru_cache(maxsize=256)
+def get_cached_converter(source_format: str, target_format: str) -> Optional[BaseConverter]:
+    """
+    Get a shared converter instance for the specified formats
+    
+    Converters keep no per-conversion state, so one instance per format pair
+    can be reused across tasks instead of being rebuilt for every conversion.
+    
+    Args:
+        source_format (str): Source file format
+        target_format (str): Target file format
+        
+    Returns:
+        BaseConverter: Converter instance or None if no converter is found
+    """
+    return converter_factory.get_converter(source_format, target_format)
+
 # Create a singleton instance
-converter_factory = ConverterFactory() 
\ No newline at end of file
+converter_factory = ConverterFactory()
\ No newline at end of file
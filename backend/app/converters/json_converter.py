@@ -5,6 +5,12 @@ import pandas as pd
 from dicttoxml import dicttoxml
 from app.converters.base_converter import BaseConverter
 
+# Prefer the libyaml-backed dumper; fall back if PyYAML was built without it
+try:
+    from yaml import CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
+
 class JSONConverter(BaseConverter):
     """Converter for JSON format files"""
     
@@ -79,7 +85,7 @@ class JSONConverter(BaseConverter):
     def _convert_to_yaml(self, data, target_path, options):
         """Convert JSON to YAML"""
         with open(target_path, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f, default_flow_style=False, allow_unicode=True)
+            yaml.dump(data, f, Dumper=_YamlDumper, default_flow_style=False, allow_unicode=True)
     
     def _convert_to_excel(self, data, target_path, options):
         """Convert JSON to Excel"""
@@ -6,6 +6,12 @@ import xml.etree.ElementTree as ET
 from collections import defaultdict
 from app.converters.base_converter import BaseConverter
 
+# Prefer the libyaml-backed dumper; fall back if PyYAML was built without it
+try:
+    from yaml import CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
+
 class XMLConverter(BaseConverter):
     """Converter for XML format files"""
     
@@ -78,12 +84,14 @@ class XMLConverter(BaseConverter):
                     result[tag] = items
         
         # Add text content if present and element has no children
+        # (isspace() avoids allocating a stripped copy for whitespace-only text)
         text = element.text
-        if text and text.strip() and not children_by_tag:
+        if text and not text.isspace() and not children_by_tag:
+            stripped = text.strip()
             if preserve_attrs and element.attrib:
-                result['#text'] = text.strip()
+                result['#text'] = stripped
             else:
-                return text.strip()
+                return stripped
         
         return result
     
@@ -98,7 +106,7 @@ class XMLConverter(BaseConverter):
     def _convert_to_yaml(self, data, target_path, options):
         """Convert dict to YAML"""
         with open(target_path, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f, default_flow_style=False, allow_unicode=True)
+            yaml.dump(data, f, Dumper=_YamlDumper, default_flow_style=False, allow_unicode=True)
     
     def _convert_to_csv(self, data, target_path, options):
         """Convert dict to CSV"""
@@ -109,8 +117,8 @@ class XMLConverter(BaseConverter):
             raise ValueError("Could not extract tabular data from XML structure")
         
         # Convert to DataFrame and save as CSV
-        df = pd.DataFrame(rows)
-        df.to_csv(target_path, index=False, **options.get('csv_options', {}))
+        df = self._rows_to_dataframe(rows)
+        self._write_csv(df, target_path, options)
     
     def _extract_rows_from_xml_dict(self, data, options):
         """Extract rows for CSV conversion from XML dict structure"""
@@ -147,9 +155,12 @@ class XMLConverter(BaseConverter):
         if current_depth > max_depth or result:
             return
         
-        if isinstance(data, list) and data and all(isinstance(item, dict) for item in data):
-            result.extend(data)
-            return
+        # Cheap rejection on the first and last items before scanning the whole list;
+        # XML-derived values are plain dicts, so exact type checks are sufficient
+        if isinstance(data, list) and data and type(data[0]) is dict and type(data[-1]) is dict:
+            if all(type(item) is dict for item in data):
+                result.extend(data)
+                return
         
         if isinstance(data, dict):
             for value in data.values():
@@ -167,9 +178,8 @@ class XMLConverter(BaseConverter):
         df = pd.DataFrame(rows)
         sheet_name = options.get('sheet_name', 'Sheet1')
         
-        writer = pd.ExcelWriter(target_path, engine='openpyxl')
-        df.to_excel(writer, sheet_name=sheet_name, index=False)
-        writer.close()
+        with self._excel_writer(target_path) as writer:
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
     
     def _convert_to_pdf(self, data, target_path, options):
         """Convert dict to PDF"""
@@ -182,74 +192,39 @@ class XMLConverter(BaseConverter):
         # Convert to DataFrame for PDF generation
         df = pd.DataFrame(rows)
         
-        # Import optional dependencies here to avoid forcing all users to install them
-        try:
-            from fpdf import FPDF
-        except ImportError:
-            raise ImportError("Converting to PDF requires the 'fpdf' package. Install it using 'pip install fpdf'.")
-        
-        # Create PDF object
-        pdf = FPDF()
-        pdf.add_page()
-        
-        # Document title
         title = options.get('title', 'XML to PDF Conversion')
-        pdf.set_font('Arial', 'B', 16)
-        pdf.cell(0, 10, title, 0, 1, 'C')
-        pdf.ln(10)
-        
-        # Set up table
-        pdf.set_font('Arial', 'B', 12)
-        
-        # Calculate column width (based on number of columns)
-        columns = df.columns
-        col_width = (pdf.w - 20) / len(columns)
-        
-        # Add headers
-        for col in columns:
-            pdf.cell(col_width, 10, str(col), 1, 0, 'C')
-        pdf.ln()
-        
-        # Add data
-        pdf.set_font('Arial', '', 10)
-        for _, row in df.iterrows():
-            for col in columns:
-                pdf.cell(col_width, 10, str(row[col])[:30], 1, 0, 'C')
-            pdf.ln()
-        
-        # Save PDF file
-        pdf.output(target_path)
+        
+        self._write_dataframe_pdf(df, target_path, title)
     
     def _convert_to_txt(self, data, target_path, options):
         """Convert dict to TXT"""
         indent = options.get('indent', 2)
         
         with open(target_path, 'w', encoding='utf-8') as f:
-            self._write_dict_to_txt(data, f, indent=indent)
+            f.writelines(self._iter_txt(data, indent=indent))
     
-    def _write_dict_to_txt(self, data, file, indent=2, level=0):
-        """Helper function to write dictionary data to text file"""
+    def _iter_txt(self, data, indent=2, level=0):
+        """Generate the text lines (with trailing newlines) for dictionary data"""
+        spaces = ' ' * (level * indent)
         if isinstance(data, dict):
+            item_prefix = f"{spaces}{' ' * indent}- "
             for key, value in data.items():
-                spaces = ' ' * (level * indent)
                 if isinstance(value, dict):
-                    file.write(f"{spaces}{key}:\n")
-                    self._write_dict_to_txt(value, file, indent, level + 1)
+                    yield f"{spaces}{key}:\n"
+                    yield from self._iter_txt(value, indent, level + 1)
                 elif isinstance(value, list):
-                    file.write(f"{spaces}{key}:\n")
+                    yield f"{spaces}{key}:\n"
                     for item in value:
                         if isinstance(item, dict):
-                            file.write(f"{spaces}{' ' * indent}- \n")
-                            self._write_dict_to_txt(item, file, indent, level + 2)
+                            yield f"{item_prefix}\n"
+                            yield from self._iter_txt(item, indent, level + 2)
                         else:
-                            file.write(f"{spaces}{' ' * indent}- {item}\n")
+                            yield f"{item_prefix}{item}\n"
                 else:
-                    file.write(f"{spaces}{key}: {value}\n")
+                    yield f"{spaces}{key}: {value}\n"
         elif isinstance(data, list):
-            spaces = ' ' * (level * indent)
             for i, item in enumerate(data):
-                file.write(f"{spaces}{i+1}.\n")
-                self._write_dict_to_txt(item, file, indent, level + 1)
+                yield f"{spaces}{i+1}.\n"
+                yield from self._iter_txt(item, indent, level + 1)
         else:
-            spaces = ' ' * (level * indent)
-            file.write(f"{spaces}{data}\n") 
\ No newline at end of file
+            yield f"{spaces}{data}\n"
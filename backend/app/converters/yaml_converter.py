@@ -1,10 +1,43 @@
 import os
 import json
 import yaml
+from functools import lru_cache
 import pandas as pd
 from dicttoxml import dicttoxml
 from app.converters.base_converter import BaseConverter
 
+# Prefer the libyaml-backed loader; fall back if PyYAML was built without it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# Only files up to this size are memoized, so a worker never pins large
+# parsed documents in memory
+YAML_CACHE_MAX_BYTES = 1024 * 1024
+
+def _parse_yaml(source_path):
+    """Parse a YAML file"""
+    # libyaml reads bytes directly, skipping a Python-level decode pass
+    with open(source_path, 'rb') as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+@lru_cache(maxsize=2)
+def _load_cached_yaml(source_path, mtime_ns, size):
+    """Parse a YAML file, memoized by path, modification time and size"""
+    return _parse_yaml(source_path)
+
+def _load_yaml(source_path):
+    """
+    Parse a YAML file. Small files are memoized so that converting the same
+    upload to several formats back-to-back only parses it once; callers must
+    treat the returned data as read-only since it may be shared.
+    """
+    stat = os.stat(source_path)
+    if stat.st_size > YAML_CACHE_MAX_BYTES:
+        return _parse_yaml(source_path)
+    return _load_cached_yaml(source_path, stat.st_mtime_ns, stat.st_size)
+
 class YAMLConverter(BaseConverter):
     """Converter for YAML format files"""
     
@@ -20,8 +53,7 @@ class YAMLConverter(BaseConverter):
         
         # Read YAML file
         try:
-            with open(source_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            data = _load_yaml(source_path)
         except Exception as e:
             raise ValueError(f"Error reading YAML file: {str(e)}")
         
@@ -47,14 +79,14 @@ class YAMLConverter(BaseConverter):
         """Convert YAML to CSV"""
         if isinstance(data, list):
             # If it's a list of objects, convert directly to dataframe
-            df = pd.DataFrame(data)
+            df = self._rows_to_dataframe(data)
         elif isinstance(data, dict):
             # If it's a dictionary, try to convert it to a dataframe
             if options.get('dict_key_for_records'):
                 # If a specific key is specified for the records
                 key = options['dict_key_for_records']
                 if key in data and isinstance(data[key], list):
-                    df = pd.DataFrame(data[key])
+                    df = self._rows_to_dataframe(data[key])
                 else:
                     raise ValueError(f"Key '{key}' not found in YAML or is not a list")
             else:
@@ -65,7 +97,7 @@ class YAMLConverter(BaseConverter):
             raise ValueError("YAML data is not in a format convertible to CSV")
         
         # Save as CSV
-        df.to_csv(target_path, index=False, **options.get('csv_options', {}))
+        self._write_csv(df, target_path, options)
     
     def _convert_to_json(self, data, target_path, options):
         """Convert YAML to JSON"""
@@ -106,9 +138,8 @@ class YAMLConverter(BaseConverter):
         else:
             raise ValueError("YAML data is not in a format convertible to Excel")
         
-        writer = pd.ExcelWriter(target_path, engine='openpyxl')
-        df.to_excel(writer, sheet_name=sheet_name, index=False)
-        writer.close()
+        with self._excel_writer(target_path) as writer:
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
     
     def _convert_to_pdf(self, data, target_path, options):
         """Convert YAML to PDF"""
@@ -127,75 +158,46 @@ class YAMLConverter(BaseConverter):
         else:
             raise ValueError("YAML data is not in a format convertible to PDF")
         
-        # Import optional dependencies here to avoid forcing all users to install them
-        try:
-            from fpdf import FPDF
-        except ImportError:
-            raise ImportError("Converting to PDF requires the 'fpdf' package. Install it using 'pip install fpdf'.")
-        
-        # Create PDF object
-        pdf = FPDF()
-        pdf.add_page()
-        
-        # Document title
         title = options.get('title', 'YAML to PDF Conversion')
-        pdf.set_font('Arial', 'B', 16)
-        pdf.cell(0, 10, title, 0, 1, 'C')
-        pdf.ln(10)
         
-        # Set up table
-        pdf.set_font('Arial', 'B', 12)
-        
-        # Calculate column width (based on number of columns)
-        columns = df.columns
-        col_width = (pdf.w - 20) / len(columns)
-        
-        # Add headers
-        for col in columns:
-            pdf.cell(col_width, 10, str(col), 1, 0, 'C')
-        pdf.ln()
-        
-        # Add data
-        pdf.set_font('Arial', '', 10)
-        for _, row in df.iterrows():
-            for col in columns:
-                pdf.cell(col_width, 10, str(row[col])[:30], 1, 0, 'C')
-            pdf.ln()
-        
-        # Save PDF file
-        pdf.output(target_path)
+        self._write_dataframe_pdf(df, target_path, title)
     
     def _convert_to_txt(self, data, target_path, options):
         """Convert YAML to TXT"""
         indent = options.get('indent', 2)
         
+        # Accumulate lines in memory and write once
+        parts = []
+        if isinstance(data, dict):
+            self._build_txt_parts(data, parts, indent=indent)
+        elif isinstance(data, list):
+            for i, item in enumerate(data):
+                parts.append(f"Item {i+1}:\n")
+                if isinstance(item, dict):
+                    self._build_txt_parts(item, parts, indent=indent, level=1)
+                else:
+                    parts.append(f"  {item}\n")
+        else:
+            parts.append(str(data))
+        
         with open(target_path, 'w', encoding='utf-8') as f:
-            if isinstance(data, dict):
-                self._write_dict_to_txt(data, f, indent=indent)
-            elif isinstance(data, list):
-                for i, item in enumerate(data):
-                    f.write(f"Item {i+1}:\n")
-                    if isinstance(item, dict):
-                        self._write_dict_to_txt(item, f, indent=indent, level=1)
-                    else:
-                        f.write(f"  {item}\n")
-            else:
-                f.write(str(data))
+            f.write(''.join(parts))
     
-    def _write_dict_to_txt(self, data, file, indent=2, level=0):
-        """Helper function to write dictionary data to text file"""
+    def _build_txt_parts(self, data, parts, indent=2, level=0):
+        """Helper function to append dictionary data as text lines to parts"""
+        spaces = ' ' * (level * indent)
+        item_prefix = f"{spaces}{' ' * indent}- "
         for key, value in data.items():
-            spaces = ' ' * (level * indent)
             if isinstance(value, dict):
-                file.write(f"{spaces}{key}:\n")
-                self._write_dict_to_txt(value, file, indent, level + 1)
+                parts.append(f"{spaces}{key}:\n")
+                self._build_txt_parts(value, parts, indent, level + 1)
             elif isinstance(value, list):
-                file.write(f"{spaces}{key}:\n")
+                parts.append(f"{spaces}{key}:\n")
                 for item in value:
                     if isinstance(item, dict):
-                        file.write(f"{spaces}{' ' * indent}- \n")
-                        self._write_dict_to_txt(item, file, indent, level + 2)
+                        parts.append(f"{item_prefix}\n")
+                        self._build_txt_parts(item, parts, indent, level + 2)
                     else:
-                        file.write(f"{spaces}{' ' * indent}- {item}\n")
+                        parts.append(f"{item_prefix}{item}\n")
             else:
-                file.write(f"{spaces}{key}: {value}\n") 
\ No newline at end of file
+                parts.append(f"{spaces}{key}: {value}\n")
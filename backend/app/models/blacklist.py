@@ -1,12 +1,28 @@
+import time
+import logging
 from datetime import datetime
+import redis
 from app.models.db import db
+from app.utils.redis_client import get_redis_client, redis_available, mark_redis_unavailable
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Marker key present while the Redis cache holds every revoked token. It
+# expires so that revocations whose cache write failed are picked up from the
+# database within this many seconds, and it vanishes if Redis loses its data
+_CACHE_SEEDED_KEY = "jti:seeded"
+CACHE_RESEED_INTERVAL = 300
 
 class TokenBlacklist(db.Model):
     """Model for tracking revoked tokens"""
     __tablename__ = 'token_blacklist'
+    __table_args__ = (
+        db.Index('ix_blacklist_expires', 'expires_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    jti = db.Column(db.String(36), nullable=False, unique=True)
+    jti = db.Column(db.String(36), nullable=False, unique=True, index=True)
     token_type = db.Column(db.String(10), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -32,18 +48,80 @@ class TokenBlacklist(db.Model):
         db.session.add(token)
         db.session.commit()
         
+        # Write the revocation through to Redis until the token would have
+        # expired anyway
+        ttl = int(jwt_payload['exp'] - time.time())
+        if ttl > 0 and redis_available():
+            try:
+                get_redis_client().setex(cls._cache_key(jti), ttl, "1")
+            except redis.RedisError as e:
+                logger.warning(f"Could not cache revoked token {jti}: {str(e)}")
+                mark_redis_unavailable()
+                # The cache is now missing a revocation; drop the marker so the
+                # next check reseeds it, if Redis is reachable for that at all
+                try:
+                    get_redis_client().delete(_CACHE_SEEDED_KEY)
+                except redis.RedisError:
+                    pass
+        
         return token
     
+    @staticmethod
+    def _cache_key(jti):
+        """Redis key under which a revoked token is cached"""
+        return f"jti:{jti}"
+    
     @classmethod
     def is_token_revoked(cls, jti):
         """Check if a token is revoked"""
-        return cls.query.filter_by(jti=jti).first() is not None
+        # Redis holds every unexpired revocation (written through on revoke and
+        # seeded from the database), so its answer is final either way
+        if redis_available():
+            try:
+                client = get_redis_client()
+                revoked, seeded = client.mget(cls._cache_key(jti), _CACHE_SEEDED_KEY)
+                if seeded is None:
+                    return jti in cls._seed_cache(client) or revoked is not None
+                return revoked is not None
+            except redis.RedisError as e:
+                logger.warning(f"Redis unavailable for token revocation check: {str(e)}")
+                mark_redis_unavailable()
+        
+        # Redis is down: fall back to the database with SELECT EXISTS, which
+        # can short-circuit on the jti index
+        return db.session.query(
+            cls.query.filter(cls.jti == jti).exists()
+        ).scalar()
+    
+    @classmethod
+    def _seed_cache(cls, client):
+        """
+        Copy all unexpired revocations from the database into Redis
+        
+        Returns:
+            set: The JTIs of the revoked tokens
+        """
+        # expires_at is stored in local time (see add_token_to_blacklist)
+        rows = db.session.query(cls.jti, cls.expires_at).filter(
+            cls.expires_at > datetime.now()
+        ).all()
+        
+        now = time.time()
+        pipe = client.pipeline(transaction=False)
+        for jti, expires_at in rows:
+            ttl = int(expires_at.timestamp() - now)
+            if ttl > 0:
+                pipe.setex(cls._cache_key(jti), ttl, "1")
+        pipe.set(_CACHE_SEEDED_KEY, "1", ex=CACHE_RESEED_INTERVAL)
+        pipe.execute()
+        
+        return {jti for jti, _ in rows}
     
     @classmethod
     def prune_database(cls):
         """Delete expired tokens"""
         now = datetime.utcnow()
-        expired = cls.query.filter(cls.expires_at < now).delete()
+        expired = cls.query.filter(cls.expires_at < now).delete(synchronize_session=False)
         db.session.commit()
         
         return expired 
\ No newline at end of file
@@ -1,10 +1,39 @@
 from datetime import datetime
 import os
+import logging
 from app.models.db import db
 from app.config import Config
 
+# Set up logging
+logger = logging.getLogger(__name__)
+
+def _iso(dt):
+    """Format an optional datetime as an ISO 8601 string"""
+    return dt.isoformat() if dt else None
+
 class Conversion(db.Model):
     __tablename__ = 'conversions'
+    __table_args__ = (
+        # User history/dashboard listings filter by user and status, newest first
+        db.Index('ix_conv_user_status_created', 'user_id', 'status', 'created_at'),
+        # Daily-limit fallback counts a user's rows created since a cutoff
+        db.Index('ix_conv_user_created', 'user_id', 'created_at'),
+        # Expired-file cleanup range-scans rows past their expiry time that are
+        # not marked expired yet, so already-swept rows stay out of the index
+        db.Index(
+            'ix_conv_expires_pending',
+            'expires_at',
+            postgresql_where=db.text("status IS NULL OR status <> 'expired'"),
+            sqlite_where=db.text("status IS NULL OR status <> 'expired'")
+        ),
+        # Scheduler polls only rows still waiting to be scheduled
+        db.Index(
+            'ix_conv_scheduled',
+            'scheduled_at',
+            postgresql_where=db.text("status = 'scheduled'"),
+            sqlite_where=db.text("status = 'scheduled'")
+        ),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -34,10 +63,14 @@ class Conversion(db.Model):
     
     def cleanup_files(self):
         """Delete the physical files associated with this conversion"""
-        if os.path.exists(self.source_file_path):
-            os.remove(self.source_file_path)
-        if os.path.exists(self.target_file_path):
-            os.remove(self.target_file_path)
+        # Unlink directly rather than stat-then-remove; a missing file is fine
+        for path in (self.source_file_path, self.target_file_path):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Error deleting file {path}: {str(e)}")
     
     def to_dict(self):
         return {
@@ -49,11 +82,11 @@ class Conversion(db.Model):
             'target_filename': self.target_filename,
             'status': self.status,
             'error_message': self.error_message,
-            'scheduled_at': self.scheduled_at.isoformat() if self.scheduled_at else None,
-            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'scheduled_at': _iso(self.scheduled_at),
+            'expires_at': _iso(self.expires_at),
+            'created_at': _iso(self.created_at),
+            'updated_at': _iso(self.updated_at),
+            'completed_at': _iso(self.completed_at),
         }
     
     def __repr__(self):
@@ -78,13 +111,16 @@ class SharedConversion(db.Model):
             'shared_by': self.shared_by,
             'shared_with': self.shared_with,
             'permission': self.permission,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'created_at': _iso(self.created_at),
         }
 
 
 class Webhook(db.Model):
     """Model to store webhook URLs for conversion notifications"""
     __tablename__ = 'webhooks'
+    __table_args__ = (
+        db.Index('ix_wh_conv_triggered', 'conversion_id', 'is_triggered'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     conversion_id = db.Column(db.Integer, db.ForeignKey('conversions.id'), nullable=False)
@@ -99,6 +135,6 @@ class Webhook(db.Model):
             'conversion_id': self.conversion_id,
             'url': self.url,
             'is_triggered': self.is_triggered,
-            'triggered_at': self.triggered_at.isoformat() if self.triggered_at else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'triggered_at': _iso(self.triggered_at),
+            'created_at': _iso(self.created_at),
         } 
\ No newline at end of file
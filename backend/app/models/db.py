@@ -1,5 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
 import os
+import functools
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session
@@ -8,7 +9,26 @@ from app.config import Config
 # Initialize SQLAlchemy instance
 db = SQLAlchemy()
 
+# Connection pool settings for server databases (SQLite pools don't accept them)
+POOL_OPTIONS = {
+    'pool_pre_ping': True,
+    'pool_size': 10,
+    'max_overflow': 20,
+    'pool_recycle': 1800,
+}
+
+# Scoped session registries, one per engine
+_session_registries = {}
+
+def _create_engine(url):
+    """Create an engine, applying pool settings for non-SQLite databases"""
+    if url.startswith('sqlite'):
+        return create_engine(url)
+    return create_engine(url, **POOL_OPTIONS)
+
 # Function to create and configure different database engines
+# Engines are cached so each configuration shares a single connection pool
+@functools.lru_cache(maxsize=None)
 def get_db_engine(db_type=None, connection_string=None):
     """
     Create a database engine based on type or connection string
@@ -21,31 +41,31 @@ def get_db_engine(db_type=None, connection_string=None):
         SQLAlchemy engine
     """
     if connection_string:
-        return create_engine(connection_string)
+        return _create_engine(connection_string)
     
     if not db_type:
         db_type = os.environ.get('DB_TYPE', 'postgresql')
     
     if db_type == 'sqlite':
         db_path = os.environ.get('SQLITE_PATH', '/tmp/file_converter.db')
-        return create_engine(f'sqlite:///{db_path}')
+        return _create_engine(f'sqlite:///{db_path}')
     elif db_type == 'postgresql':
         host = os.environ.get('POSTGRES_HOST', 'localhost')
         port = os.environ.get('POSTGRES_PORT', '5432')
         user = os.environ.get('POSTGRES_USER', 'postgres')
         password = os.environ.get('POSTGRES_PASSWORD', 'postgres')
         database = os.environ.get('POSTGRES_DB', 'file_converter')
-        return create_engine(f'postgresql://{user}:{password}@{host}:{port}/{database}')
+        return _create_engine(f'postgresql://{user}:{password}@{host}:{port}/{database}')
     elif db_type == 'mysql':
         host = os.environ.get('MYSQL_HOST', 'localhost')
         port = os.environ.get('MYSQL_PORT', '3306')
         user = os.environ.get('MYSQL_USER', 'root')
         password = os.environ.get('MYSQL_PASSWORD', 'root')
         database = os.environ.get('MYSQL_DB', 'file_converter')
-        return create_engine(f'mysql+pymysql://{user}:{password}@{host}:{port}/{database}')
+        return _create_engine(f'mysql+pymysql://{user}:{password}@{host}:{port}/{database}')
     else:
         # Default to PostgreSQL
-        return create_engine(Config.DATABASE_URL)
+        return _create_engine(Config.DATABASE_URL)
 
 # Create base class for declarative models
 Base = declarative_base()
@@ -66,14 +86,14 @@ def setup_db_session(app=None, engine=None):
         # Configure SQLAlchemy with Flask
         db.init_app(app)
         return db.session
-    elif engine:
-        # Create standalone session
-        session_factory = sessionmaker(bind=engine)
-        Session = scoped_session(session_factory)
-        return Session
-    else:
+    
+    if not engine:
         # Use default engine
-        default_engine = get_db_engine()
-        session_factory = sessionmaker(bind=default_engine)
-        Session = scoped_session(session_factory)
-        return Session 
\ No newline at end of file
+        engine = get_db_engine()
+    
+    # Reuse the session registry already created for this engine
+    if engine not in _session_registries:
+        session_factory = sessionmaker(bind=engine)
+        _session_registries[engine] = scoped_session(session_factory)
+    
+    return _session_registries[engine]
@@ -1,7 +1,29 @@
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+import math
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHash
+from werkzeug.security import check_password_hash
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import selectinload
 from app.models.db import db
+from app.config import Config
+
+# Argon2id hasher (libargon2 C implementation) for user passwords
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=2)
+
+# Daily conversion limit per tier, built from Config.USER_TIERS on first use
+_DAILY_LIMITS = None
+
+def _daily_limits():
+    global _DAILY_LIMITS
+    if _DAILY_LIMITS is None:
+        # A negative limit in the tier config means unlimited
+        _DAILY_LIMITS = {
+            tier: math.inf if options['daily_conversions'] < 0 else options['daily_conversions']
+            for tier, options in Config.USER_TIERS.items()
+        }
+    return _DAILY_LIMITS
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -12,58 +34,97 @@ class User(db.Model):
     _password_hash = db.Column(db.String(256), nullable=False)
     tier = db.Column(db.String(20), default='free')  # 'free', 'premium', or 'enterprise'
     avatar_url = db.Column(db.String(255), nullable=True)
-    _settings = db.Column(db.Text, nullable=True)  # JSON string of user settings
+    # User settings, decoded once when the row is loaded (JSONB on PostgreSQL)
+    settings = db.Column('_settings', db.JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), 'postgresql'), nullable=True)
     last_login = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    conversions = db.relationship('Conversion', backref='user', lazy=True)
+    # Collections raise instead of lazy loading; load them explicitly with
+    # selectinload (see with_conversions) where they are needed
+    conversions = db.relationship('Conversion', backref='user', lazy='raise_on_sql')
     # Templates relationship is defined in Template model
     # Add a relationship for shared conversions where this user is the sharer
     shared_by_me = db.relationship(
         'SharedConversion',
         foreign_keys='SharedConversion.shared_by',
         backref='shared_by_user',
-        lazy=True
+        lazy='raise_on_sql'
     )
     # Add a relationship for shared conversions where this user is the recipient
     shared_with_me = db.relationship(
         'SharedConversion',
         foreign_keys='SharedConversion.shared_with',
         backref='shared_with_user',
-        lazy=True
+        lazy='raise_on_sql'
     )
     
+    @classmethod
+    def with_conversions(cls, user_id):
+        """Get a user with their conversions loaded in one extra query"""
+        return db.session.get(cls, user_id, options=[selectinload(cls.conversions)])
+    
     @hybrid_property
     def password(self):
         raise AttributeError('Password is not a readable attribute')
     
     @password.setter
     def password(self, password):
-        self._password_hash = generate_password_hash(password)
+        self._password_hash = _password_hasher.hash(password)
     
     def verify_password(self, password):
-        return check_password_hash(self._password_hash, password)
+        if not self._password_hash.startswith('$argon2'):
+            # Legacy Werkzeug PBKDF2 hash: upgrade it to Argon2 on a successful check
+            if not check_password_hash(self._password_hash, password):
+                return False
+            self.password = password
+            return True
+        
+        try:
+            _password_hasher.verify(self._password_hash, password)
+        except (VerificationError, InvalidHash):
+            return False
+        
+        # Re-hash if the hasher parameters have changed since this hash was made
+        if _password_hasher.check_needs_rehash(self._password_hash):
+            self.password = password
+        return True
     
     def get_daily_limit(self):
-        from app.config import Config
-        if self.tier == 'enterprise':
-            return float('inf')  # Unlimited conversions
-        elif self.tier == 'premium':
-            return Config.PREMIUM_TIER_DAILY_LIMIT
-        else:
-            return Config.FREE_TIER_DAILY_LIMIT
+        limits = _daily_limits()
+        return limits.get(self.tier, limits['free'])
     
     def get_daily_conversions_count(self):
+        import redis
+        from app.utils.limits import get_daily, seed_daily
+        
+        # Served from the Redis window; the database is only queried if Redis
+        # is down or the window has not been seeded yet
+        redis_up = True
+        try:
+            count = get_daily(self.id)
+            if count is not None:
+                return count
+        except redis.RedisError:
+            redis_up = False
+        
         from app.models.conversion import Conversion
         from datetime import datetime, timedelta
         
         yesterday = datetime.utcnow() - timedelta(days=1)
-        return Conversion.query.filter(
+        recent = db.session.query(Conversion.id, Conversion.created_at).filter(
             Conversion.user_id == self.id,
             Conversion.created_at >= yesterday
-        ).count()
+        ).all()
+        
+        if redis_up:
+            try:
+                seed_daily(self.id, recent)
+            except redis.RedisError:
+                pass
+        
+        return len(recent)
     
     def can_convert(self):
         return self.get_daily_conversions_count() < self.get_daily_limit()
@@ -72,21 +133,6 @@ class User(db.Model):
         self.last_login = datetime.utcnow()
         db.session.commit()
     
-    @property
-    def settings(self):
-        import json
-        if self._settings:
-            return json.loads(self._settings)
-        return {}
-    
-    @settings.setter
-    def settings(self, value):
-        import json
-        if value is None:
-            self._settings = None
-        else:
-            self._settings = json.dumps(value)
-    
     def to_dict(self):
         return {
             'id': self.id,
@@ -94,7 +140,7 @@ class User(db.Model):
             'email': self.email,
             'tier': self.tier,
             'avatar_url': self.avatar_url,
-            'settings': self.settings,
+            'settings': self.settings or {},
             'last_login': self.last_login.isoformat() if self.last_login else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
@@ -1,20 +1,48 @@
-from celery import Celery
+from celery import Celery, group
+from celery_batches import Batches
 from flask import current_app
 import os
 import requests
+from requests.adapters import HTTPAdapter
+import logging
 from datetime import datetime
 import json
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import select, update
+from sqlalchemy.orm import selectinload, raiseload
 
 from app.models.db import db
 from app.models.conversion import Conversion, Webhook
-from app.converters.converter_factory import ConverterFactory
+from app.converters.converter_factory import get_cached_converter
 from app.utils.file_utils import cleanup_expired_files
 
+# Set up logging
+logger = logging.getLogger(__name__)
+
 # Initialize Celery
 celery = Celery('app')
 
+# Flask app the workers run against, set by configure_celery
+_flask_app = None
+
+# Webhook notifications are coalesced and sent in batches of up to this many
+WEBHOOK_BATCH_SIZE = 50
+WEBHOOK_MAX_RETRIES = 3
+WEBHOOK_SEND_WORKERS = 8
+# Timeout for the inline delivery attempt made right after a conversion
+WEBHOOK_INLINE_TIMEOUT = 2
+
+# Shared HTTP session so webhook deliveries reuse keep-alive TCP/TLS connections
+_webhook_session = requests.Session()
+_webhook_adapter = HTTPAdapter(pool_connections=64, pool_maxsize=128, max_retries=0)
+_webhook_session.mount('https://', _webhook_adapter)
+_webhook_session.mount('http://', _webhook_adapter)
+
 def configure_celery(app):
     """Configure Celery with Flask application"""
+    global _flask_app
+    _flask_app = app
+    
     celery.conf.update(
         broker_url=app.config.get('CELERY_BROKER_URL'),
         result_backend=app.config.get('CELERY_RESULT_BACKEND'),
@@ -40,12 +68,20 @@ def process_conversion(self, conversion_id, options=None):
     options = options or {}
     
     try:
-        # Get the conversion record
-        conversion = Conversion.query.get(conversion_id)
+        # Get the conversion record with its webhooks in one extra query;
+        # any other lazy load during the task raises instead of querying
+        conversion = db.session.get(
+            Conversion,
+            conversion_id,
+            options=[selectinload(Conversion.webhooks), raiseload('*')]
+        )
         
         if not conversion:
             raise ValueError(f"Conversion {conversion_id} not found")
         
+        # Read webhooks now; commits below expire the loaded objects
+        webhooks = [(webhook.id, webhook.url) for webhook in conversion.webhooks]
+        
         # Skip if already completed or failed
         if conversion.status in ['completed', 'failed']:
             return {
@@ -59,7 +95,7 @@ def process_conversion(self, conversion_id, options=None):
         db.session.commit()
         
         # Get converter instance
-        converter = ConverterFactory.get_converter(
+        converter = get_cached_converter(
             conversion.source_format, 
             conversion.target_format
         )
@@ -71,10 +107,11 @@ def process_conversion(self, conversion_id, options=None):
             options
         )
         
-        # Update the conversion record
+        # Update the conversion record (one timestamp reused for webhooks below)
+        now = datetime.utcnow()
         if success:
             conversion.status = 'completed'
-            conversion.completed_at = datetime.utcnow()
+            conversion.completed_at = now
         else:
             conversion.status = 'failed'
             conversion.error_message = error
@@ -82,13 +119,12 @@ def process_conversion(self, conversion_id, options=None):
         db.session.commit()
         
         # Trigger webhooks if conversion is complete
-        if success and conversion.webhooks:
-            for webhook in conversion.webhooks:
-                try:
-                    send_webhook_notification.delay(webhook.id, conversion.to_dict())
-                except Exception as e:
-                    # Log webhook error but continue
-                    current_app.logger.error(f"Error sending webhook notification: {str(e)}")
+        if success and webhooks:
+            try:
+                _notify_webhooks(webhooks, conversion.to_dict(), now)
+            except Exception as e:
+                # Log webhook error but continue
+                current_app.logger.error(f"Error sending webhook notifications: {str(e)}")
         
         return {
             'conversion_id': conversion_id,
@@ -123,99 +159,300 @@ def process_conversion(self, conversion_id, options=None):
 def process_batch_conversion(self, conversion_ids, options=None):
     """Process multiple conversions in the background"""
     options = options or {}
-    results = []
     
-    for conversion_id in conversion_ids:
-        # Process each conversion
-        result = process_conversion.delay(conversion_id, options)
-        results.append(result.id)
+    # Publish all conversions as one group over a single producer connection
+    job = group(process_conversion.s(conversion_id, options) for conversion_id in conversion_ids)
+    result = job.apply_async()
     
     return {
         'conversion_ids': conversion_ids,
-        'task_ids': results,
+        'group_id': result.id,
+        'task_ids': [child.id for child in result.results],
         'status': 'processing',
         'message': f'Processing {len(conversion_ids)} conversions'
     }
 
-@celery.task(bind=True, name='send_webhook_notification', max_retries=3)
-def send_webhook_notification(self, webhook_id, conversion_data=None):
-    """Send a webhook notification"""
+class ContextBatches(Batches):
+    """Batches task base that runs each flushed batch inside the Flask app context"""
+    
+    def __call__(self, *args, **kwargs):
+        if _flask_app is None:
+            return self.run(*args, **kwargs)
+        with _flask_app.app_context():
+            return self.run(*args, **kwargs)
+
+def _post_webhook(url, payload, timeout=10):
+    """POST a webhook payload, returning (status_code, error)"""
     try:
-        # Get the webhook record
-        webhook = Webhook.query.get(webhook_id)
+        response = _webhook_session.post(
+            url,
+            json=payload,
+            headers={'Content-Type': 'application/json', 'Connection': 'keep-alive'},
+            timeout=timeout
+        )
+        return response.status_code, None
+    except Exception as e:
+        return None, str(e)
+
+def _is_delivered(status_code, error):
+    """Check whether a _post_webhook result counts as delivered (a 2xx response)"""
+    return error is None and 200 <= status_code < 300
+
+def _notify_webhooks(webhooks, conversion_data, now=None):
+    """
+    Deliver conversion webhooks inline, queueing only failed deliveries
+    
+    Args:
+        webhooks: List of (webhook_id, url) tuples
+        conversion_data: Serialized conversion sent as the payload data
+        now: Event time used for the payload and triggered_at (defaults to utcnow)
+    """
+    now = now or datetime.utcnow()
+    timestamp = now.isoformat()
+    
+    def deliver(webhook):
+        webhook_id, url = webhook
+        payload = {
+            'webhook_id': webhook_id,
+            'timestamp': timestamp,
+            'event': 'conversion.completed',
+            'data': conversion_data
+        }
+        return _post_webhook(url, payload, timeout=WEBHOOK_INLINE_TIMEOUT)
+    
+    with ThreadPoolExecutor(max_workers=min(WEBHOOK_SEND_WORKERS, len(webhooks))) as executor:
+        responses = list(executor.map(deliver, webhooks))
+    
+    sent_ids = []
+    failed_ids = []
+    for (webhook_id, _), (status_code, error) in zip(webhooks, responses):
+        if _is_delivered(status_code, error):
+            sent_ids.append(webhook_id)
+        else:
+            failed_ids.append(webhook_id)
+    
+    if sent_ids:
+        db.session.execute(
+            update(Webhook)
+            .where(Webhook.id.in_(sent_ids))
+            .values(is_triggered=True, triggered_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    
+    # Failed deliveries go through the persistent, retried Celery path; the
+    # inline try counts as the first attempt, so the usual backoff applies
+    for webhook_id in failed_ids:
+        _schedule_webhook_retry(webhook_id, conversion_data, 1)
+
+def _schedule_webhook_retry(webhook_id, conversion_data, attempt):
+    """Queue another delivery attempt, backing off linearly by a minute per attempt"""
+    send_webhook_notification.apply_async(
+        args=(webhook_id, conversion_data),
+        kwargs={'attempt': attempt},
+        countdown=60 * attempt
+    )
+
+@celery.task(
+    base=ContextBatches,
+    name='send_webhook_notification',
+    flush_every=WEBHOOK_BATCH_SIZE,
+    flush_interval=1.0
+)
+def send_webhook_notification(requests_batch):
+    """
+    Send a batch of webhook notifications
+    
+    Each request carries (webhook_id, conversion_data=None, attempt=0). Webhooks
+    and missing conversion data are loaded with one query each, the HTTP
+    requests are sent concurrently and all delivered webhooks are marked as
+    triggered with a single UPDATE.
+    """
+    retries = []
+    try:
+        results = _deliver_webhook_batch(requests_batch, retries)
+    except Exception as e:
+        # celery-batches has already acknowledged the buffered messages, so
+        # re-queue every request rather than lose the whole batch
+        logger.exception("Error sending webhook notification batch")
+        db.session.rollback()
         
+        results = {}
+        retries = []
+        for request in requests_batch:
+            webhook_id, conversion_data, attempt = _webhook_request_args(request)
+            if attempt < WEBHOOK_MAX_RETRIES:
+                retries.append((webhook_id, conversion_data, attempt + 1))
+            results[request.id] = {
+                'webhook_id': webhook_id,
+                'status': 'failed',
+                'message': 'Webhook notification failed',
+                'error': str(e)
+            }
+    
+    # Batched tasks cannot use self.retry, so re-queue failed deliveries with a backoff
+    for webhook_id, conversion_data, attempt in retries:
+        _schedule_webhook_retry(webhook_id, conversion_data, attempt)
+    
+    # Store a result for every buffered request
+    for request in requests_batch:
+        celery.backend.mark_as_done(request.id, results[request.id], request=request)
+
+def _webhook_request_args(request):
+    """Get (webhook_id, conversion_data, attempt) from a buffered webhook request"""
+    webhook_id = request.args[0]
+    if len(request.args) > 1:
+        conversion_data = request.args[1]
+    else:
+        conversion_data = request.kwargs.get('conversion_data')
+    return webhook_id, conversion_data, request.kwargs.get('attempt', 0)
+
+def _deliver_webhook_batch(requests_batch, retries):
+    """
+    Deliver a batch of buffered webhook requests
+    
+    Args:
+        requests_batch: Buffered send_webhook_notification requests
+        retries: List extended with (webhook_id, conversion_data, attempt) for
+            each failed delivery that should be attempted again
+        
+    Returns:
+        dict: Task result for each request, by request id
+    """
+    # Normalise the buffered requests to (request, webhook_id, conversion_data, attempt)
+    entries = [(request, *_webhook_request_args(request)) for request in requests_batch]
+    
+    webhook_ids = {entry[1] for entry in entries}
+    webhooks = {
+        webhook.id: webhook
+        for webhook in Webhook.query.filter(Webhook.id.in_(webhook_ids)).all()
+    }
+    
+    # Load conversion data for requests that did not provide it
+    missing_conversion_ids = {
+        webhooks[webhook_id].conversion_id
+        for _, webhook_id, conversion_data, _ in entries
+        if conversion_data is None and webhook_id in webhooks
+    }
+    conversions_data = {}
+    if missing_conversion_ids:
+        conversions_data = {
+            conversion.id: conversion.to_dict()
+            for conversion in Conversion.query.filter(Conversion.id.in_(missing_conversion_ids)).all()
+        }
+    
+    # Prepare the payloads
+    results = {}
+    deliveries = []
+    now = datetime.utcnow()
+    timestamp = now.isoformat()
+    for request, webhook_id, conversion_data, attempt in entries:
+        webhook = webhooks.get(webhook_id)
         if not webhook:
-            raise ValueError(f"Webhook {webhook_id} not found")
+            results[request.id] = {
+                'webhook_id': webhook_id,
+                'status': 'failed',
+                'message': 'Webhook notification failed',
+                'error': f"Webhook {webhook_id} not found"
+            }
+            continue
         
-        # Get conversion data if not provided
         if conversion_data is None:
-            conversion = Conversion.query.get(webhook.conversion_id)
-            if not conversion:
-                raise ValueError(f"Conversion {webhook.conversion_id} not found")
-            conversion_data = conversion.to_dict()
+            conversion_data = conversions_data.get(webhook.conversion_id)
+            if conversion_data is None:
+                results[request.id] = {
+                    'webhook_id': webhook_id,
+                    'status': 'failed',
+                    'message': 'Webhook notification failed',
+                    'error': f"Conversion {webhook.conversion_id} not found"
+                }
+                continue
         
-        # Prepare the payload
         payload = {
             'webhook_id': webhook_id,
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': timestamp,
             'event': 'conversion.completed',
             'data': conversion_data
         }
+        deliveries.append((request, webhook_id, conversion_data, attempt, webhook.url, payload))
+    
+    # Send the webhook notifications concurrently over the pooled session
+    responses = []
+    if deliveries:
+        with ThreadPoolExecutor(max_workers=min(WEBHOOK_SEND_WORKERS, len(deliveries))) as executor:
+            responses = list(executor.map(lambda delivery: _post_webhook(delivery[4], delivery[5]), deliveries))
+    
+    sent_ids = []
+    for (request, webhook_id, conversion_data, attempt, _, _), (status_code, error) in zip(deliveries, responses):
+        if _is_delivered(status_code, error):
+            sent_ids.append(webhook_id)
+            results[request.id] = {
+                'webhook_id': webhook_id,
+                'status': 'sent',
+                'status_code': status_code,
+                'message': 'Webhook notification sent successfully'
+            }
+            continue
         
-        # Send the webhook notification
-        response = requests.post(
-            webhook.url,
-            json=payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=10  # 10 seconds timeout
-        )
-        
-        # Mark webhook as triggered
-        webhook.is_triggered = True
-        webhook.triggered_at = datetime.utcnow()
-        db.session.commit()
-        
-        return {
-            'webhook_id': webhook_id,
-            'status': 'sent',
-            'status_code': response.status_code,
-            'message': 'Webhook notification sent successfully'
-        }
+        if error is None:
+            error = f"Webhook endpoint responded with HTTP {status_code}"
         
-    except Exception as e:
-        # Retry the task if appropriate
-        if self.request.retries < self.max_retries:
-            self.retry(exc=e, countdown=60 * (self.request.retries + 1))
+        if attempt < WEBHOOK_MAX_RETRIES:
+            retries.append((webhook_id, conversion_data, attempt + 1))
         
-        return {
+        results[request.id] = {
             'webhook_id': webhook_id,
             'status': 'failed',
             'message': 'Webhook notification failed',
-            'error': str(e)
+            'error': error
         }
+    
+    # Mark all delivered webhooks as triggered in one statement
+    if sent_ids:
+        db.session.execute(
+            update(Webhook)
+            .where(Webhook.id.in_(sent_ids))
+            .values(is_triggered=True, triggered_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    
+    return results
 
 @celery.task(name='check_scheduled_conversions')
 def check_scheduled_conversions():
     """Check for scheduled conversions that are due to be processed"""
-    # Find conversions that are scheduled and due
+    # Claim all due conversions with a single bulk UPDATE and one commit
     now = datetime.utcnow()
-    scheduled_conversions = Conversion.query.filter(
+    due = update(Conversion).where(
         Conversion.status == 'scheduled',
         Conversion.scheduled_at <= now
-    ).all()
+    ).values(status='pending').execution_options(synchronize_session=False)
     
-    for conversion in scheduled_conversions:
-        # Update status to pending
-        conversion.status = 'pending'
-        db.session.commit()
-        
-        # Process the conversion
-        process_conversion.delay(conversion.id)
+    if db.session.get_bind().dialect.update_returning:
+        conversion_ids = db.session.execute(due.returning(Conversion.id)).scalars().all()
+    else:
+        # No UPDATE ... RETURNING (e.g. MySQL): select the due ids, then update them
+        # by id. The selected rows stay locked until the commit and concurrent
+        # workers skip them, so each conversion is claimed and dispatched once
+        conversion_ids = db.session.execute(
+            select(Conversion.id).where(
+                Conversion.status == 'scheduled',
+                Conversion.scheduled_at <= now
+            ).with_for_update(skip_locked=True)
+        ).scalars().all()
+        if conversion_ids:
+            db.session.execute(due.where(Conversion.id.in_(conversion_ids)))
+    db.session.commit()
+    
+    # Process the conversions
+    if conversion_ids:
+        group(process_conversion.s(conversion_id) for conversion_id in conversion_ids).apply_async()
     
     return {
         'status': 'completed',
-        'message': f'Checked {len(scheduled_conversions)} scheduled conversions',
-        'scheduled_conversions': len(scheduled_conversions)
+        'message': f'Checked {len(conversion_ids)} scheduled conversions',
+        'scheduled_conversions': len(conversion_ids)
     }
 
 @celery.task(name='cleanup_expired_files_task')
@@ -3,14 +3,20 @@ import threading
 import queue
 import time
 import logging
+import uuid
+from collections import defaultdict
+from itertools import chain, count, zip_longest
 from typing import List, Dict, Any, Callable, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from app.converters.converter_factory import ConverterFactory
+from concurrent.futures import ThreadPoolExecutor
+from app.converters.converter_factory import get_cached_converter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Process-wide sequence used to build task IDs
+_task_seq = count()
+
 class BatchProcessorTask:
     """Represents a single file conversion task in the batch"""
     
@@ -29,17 +35,24 @@ class BatchProcessorTask:
         self.task_id = task_id or self._generate_task_id()
         self.start_time = None
         self.end_time = None
+        # Monotonic clock readings used for the duration
+        self._started = None
+        self._finished = None
         self.status = "pending"  # pending, processing, completed, failed
         self.error = None
         self.result = None
         
     def _generate_task_id(self) -> str:
         """Generate a unique task ID"""
-        return f"{int(time.time())}-{os.path.basename(self.source_path)}"
+        # Sequence number plus a random suffix, so the same file added twice
+        # within a second no longer produces colliding IDs
+        return f"{next(_task_seq):x}-{uuid.uuid4().hex[:8]}"
     
     @property
     def duration(self) -> Optional[float]:
         """Calculate duration in seconds"""
+        if self._started is not None and self._finished is not None:
+            return self._finished - self._started
         if self.start_time and self.end_time:
             return self.end_time - self.start_time
         return None
@@ -70,12 +83,17 @@ class BatchProcessor:
     def __init__(self, max_workers: int = MAX_WORKERS):
         self.max_workers = max_workers
         self.tasks: Dict[str, BatchProcessorTask] = {}
+        self._tasks_lock = threading.Lock()
         self.results: Dict[str, Any] = {}
         self.active = False
         self.task_queue = queue.Queue()
         self.processing_thread = None
         self.on_progress_callback: Optional[Callable[[str, int, int], None]] = None
         self.on_task_complete_callback: Optional[Callable[[str, bool], None]] = None
+        # Worker pool kept across start() calls, so threads are not created and
+        # torn down for every batch
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
     
     def add_task(self, task: BatchProcessorTask) -> str:
         """
@@ -87,7 +105,8 @@ class BatchProcessor:
         Returns:
             str: The task ID
         """
-        self.tasks[task.task_id] = task
+        with self._tasks_lock:
+            self.tasks[task.task_id] = task
         self.task_queue.put(task.task_id)
         return task.task_id
     
@@ -159,87 +178,122 @@ class BatchProcessor:
         Returns:
             int: Number of tasks cleared
         """
-        count = 0
-        for task_id in list(self.tasks.keys()):
-            task = self.tasks[task_id]
-            if task.status in ("completed", "failed"):
-                del self.tasks[task_id]
-                count += 1
-        return count
+        # Rebuild the dict in one pass rather than deleting entries one by one
+        with self._tasks_lock:
+            before = len(self.tasks)
+            self.tasks = {
+                task_id: task for task_id, task in self.tasks.items()
+                if task.status not in ("completed", "failed")
+            }
+            return before - len(self.tasks)
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down this processor's worker pool (e.g. on application teardown)"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get this processor's worker pool, creating it on first use or after shutdown"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='batchproc')
+            return self._executor
     
     def _process_batch(self) -> None:
         """Main processing loop - processes tasks in parallel with worker threads"""
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_task_id = {}
-            completed_count = 0
-            total_count = self.task_queue.qsize()
+        executor = self._get_executor()
+        
+        # Finished futures are pushed here by their done callbacks, so the
+        # loop blocks until a task completes instead of polling
+        done_queue = queue.Queue()
+        outstanding = 0
+        completed_count = 0
+        
+        # Work from a local snapshot of the queue instead of checking it each pass
+        pending = self._drain_task_queue()
+        next_index = 0
+        total_count = len(pending)
+        
+        while self.active:
+            # Pick up tasks queued since the last snapshot once it is used up
+            if next_index == len(pending):
+                pending = self._drain_task_queue()
+                next_index = 0
+                total_count += len(pending)
+            
+            # Submit new tasks while we have capacity and tasks available
+            while outstanding < self.max_workers and next_index < len(pending):
+                task_id = pending[next_index]
+                next_index += 1
+                task = self.tasks[task_id]
+                task.status = "processing"
+                task.start_time = time.time()
+                task._started = time.perf_counter()
+                
+                future = executor.submit(
+                    self._process_task, 
+                    task_id, 
+                    task.source_path, 
+                    task.target_path, 
+                    task.source_format, 
+                    task.target_format, 
+                    task.options
+                )
+                future.add_done_callback(lambda f, tid=task_id: done_queue.put((tid, f)))
+                outstanding += 1
             
-            while self.active:
-                # Submit new tasks while we have capacity and tasks available
-                while len(future_to_task_id) < self.max_workers and not self.task_queue.empty():
-                    try:
-                        task_id = self.task_queue.get_nowait()
-                        task = self.tasks[task_id]
-                        task.status = "processing"
-                        task.start_time = time.time()
-                        
-                        future = executor.submit(
-                            self._process_task, 
-                            task_id, 
-                            task.source_path, 
-                            task.target_path, 
-                            task.source_format, 
-                            task.target_format, 
-                            task.options
-                        )
-                        future_to_task_id[future] = task_id
-                    except queue.Empty:
-                        break
+            # If no active tasks and queue is empty, exit
+            if not outstanding:
+                logger.info("All tasks completed, batch processor stopping")
+                break
+            
+            # Wait for the next task to finish
+            task_id, future = done_queue.get()
+            outstanding -= 1
+            task = self.tasks[task_id]
+            task._finished = time.perf_counter()
+            task.end_time = time.time()
+            
+            try:
+                success, error = future.result()
                 
-                # Process completed tasks
-                for future in list(as_completed(future_to_task_id.keys(), timeout=0.1)):
-                    task_id = future_to_task_id.pop(future)
-                    task = self.tasks[task_id]
+                if success:
+                    task.status = "completed"
+                    logger.info(f"Task {task_id} completed in {task.duration:.2f}s")
+                else:
+                    task.status = "failed"
+                    task.error = error
+                    logger.error(f"Task {task_id} failed: {error}")
                     
-                    try:
-                        success, error = future.result()
-                        task.end_time = time.time()
-                        
-                        if success:
-                            task.status = "completed"
-                            logger.info(f"Task {task_id} completed in {task.duration:.2f}s")
-                        else:
-                            task.status = "failed"
-                            task.error = error
-                            logger.error(f"Task {task_id} failed: {error}")
-                            
-                        if self.on_task_complete_callback:
-                            self.on_task_complete_callback(task_id, success)
-                            
-                    except Exception as e:
-                        task.status = "failed"
-                        task.error = str(e)
-                        task.end_time = time.time()
-                        logger.exception(f"Exception processing task {task_id}")
-                        
-                        if self.on_task_complete_callback:
-                            self.on_task_complete_callback(task_id, False)
+                if self.on_task_complete_callback:
+                    self.on_task_complete_callback(task_id, success)
                     
-                    completed_count += 1
-                    if self.on_progress_callback:
-                        self.on_progress_callback(task_id, completed_count, total_count)
+            except Exception as e:
+                task.status = "failed"
+                task.error = str(e)
+                logger.exception(f"Exception processing task {task_id}")
                 
-                # If no active tasks and queue is empty, exit
-                if not future_to_task_id and self.task_queue.empty():
-                    logger.info("All tasks completed, batch processor stopping")
-                    break
-                    
-                # Brief pause to avoid spinning
-                time.sleep(0.1)
+                if self.on_task_complete_callback:
+                    self.on_task_complete_callback(task_id, False)
+            
+            completed_count += 1
+            if self.on_progress_callback:
+                self.on_progress_callback(task_id, completed_count, total_count)
         
         # Mark as inactive when done
         self.active = False
     
+    def _drain_task_queue(self) -> List[str]:
+        """Take every task ID currently in the queue"""
+        task_ids = []
+        while True:
+            try:
+                task_ids.append(self.task_queue.get_nowait())
+            except queue.Empty:
+                return task_ids
+    
     def _process_task(self, 
                       task_id: str, 
                       source_path: str, 
@@ -255,7 +309,7 @@ class BatchProcessor:
         """
         try:
             # Get a converter for this format pair
-            converter = ConverterFactory.get_converter(source_format, target_format)
+            converter = get_cached_converter(source_format, target_format)
             
             # Ensure target directory exists
             os.makedirs(os.path.dirname(target_path), exist_ok=True)
@@ -289,25 +343,13 @@ class BatchProcessor:
             return []
             
         # Group by source_format -> target_format pairs
-        format_groups = {}
+        format_groups = defaultdict(list)
         for task in tasks:
-            key = f"{task.source_format}->{task.target_format}"
-            if key not in format_groups:
-                format_groups[key] = []
-            format_groups[key].append(task)
+            format_groups[(task.source_format, task.target_format)].append(task)
         
         # Sort groups by size (descending) to process largest groups first
-        sorted_groups = sorted(format_groups.items(), key=lambda x: len(x[1]), reverse=True)
-        
-        # Interleave tasks from different groups for fair distribution
-        optimized_tasks = []
-        group_indices = {key: 0 for key, _ in sorted_groups}
-        
-        while any(group_indices[key] < len(group) for key, group in sorted_groups):
-            for key, group in sorted_groups:
-                idx = group_indices[key]
-                if idx < len(group):
-                    optimized_tasks.append(group[idx])
-                    group_indices[key] += 1
+        sorted_groups = sorted(format_groups.values(), key=len, reverse=True)
         
-        return optimized_tasks 
\ No newline at end of file
+        # Interleave tasks from different groups for fair distribution; zip_longest
+        # takes one task per group per round and pads exhausted groups with None
+        return [task for task in chain.from_iterable(zip_longest(*sorted_groups)) if task is not None]
\ No newline at end of file
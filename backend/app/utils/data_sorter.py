@@ -3,14 +3,107 @@ Data sorting utilities for organizing conversions and file data.
 Provides various algorithms for sorting and organizing data.
 """
 
+import bisect
+import functools
 import logging
+import operator
+import statistics
+from collections import Counter, defaultdict
 from datetime import datetime
 from enum import Enum
-from typing import List, Dict, Any, Callable, Optional, Union
+from itertools import islice
+from typing import List, Dict, Any, Callable, Iterable, Optional, Union
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Whether sort_conversions has already noted that the algorithm argument is ignored
+_algorithm_notice_logged = False
+
+# File size bucket boundaries (lower bound of each bucket after the first) and labels
+_SIZE_BREAKS = (1 * 1024 * 1024, 10 * 1024 * 1024, 50 * 1024 * 1024, 100 * 1024 * 1024)
+_SIZE_LABELS = ("0-1MB", "1-10MB", "10-50MB", "50-100MB", "100MB+")
+
+# From this many conversions, sorts on integer fields are done with NumPy
+_NUMPY_SORT_THRESHOLD = 2048
+
+# Fields looked at by the "search" filter
+_SEARCH_FIELDS = ("source_filename", "target_filename", "source_format", "target_format", "status")
+
+@functools.lru_cache(maxsize=4096)
+def _parse_iso(value: str) -> datetime:
+    """Parse an ISO 8601 string (accepting a trailing 'Z'), memoized for repeated timestamps"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+@functools.lru_cache(maxsize=256)
+def _compile_key(key: str) -> Callable[[Dict[str, Any]], Any]:
+    """Build a getter for a (possibly nested, e.g. 'user.name') key; missing values give None"""
+    if '.' not in key:
+        return operator.methodcaller('get', key)
+    
+    parts = tuple(key.split('.'))
+    
+    def get_value(item):
+        value = item
+        for part in parts:
+            if isinstance(value, dict) and part in value:
+                value = value[part]
+            else:
+                return None
+        return value
+    
+    return get_value
+
+def _argsort_int_values(values: List[Any], descending: bool) -> Optional[List[int]]:
+    """
+    Stable sort order for integer values with None placed last, computed with NumPy
+    
+    Returns None when the values are not all integers (or None) or NumPy is unavailable.
+    """
+    if not all(value is None or type(value) is int for value in values):
+        return None
+    
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    
+    count = len(values)
+    missing = np.fromiter((value is None for value in values), dtype=bool, count=count)
+    try:
+        keys = np.fromiter((0 if value is None else value for value in values), dtype=np.int64, count=count)
+    except OverflowError:
+        return None
+    
+    if descending:
+        # Negating keeps ties in their original order, unlike reversing an ascending sort
+        if count and keys.min() == np.iinfo(np.int64).min:
+            return None
+        keys = -keys
+    
+    # lexsort is stable and sorts by the last key first: present values, then by value
+    return np.lexsort((keys, missing)).tolist()
+
+# Maps every digit to '0', giving the "shape" of an ISO 8601 string
+_ISO_DIGITS = str.maketrans("0123456789", "0000000000")
+
+def _utc_iso_string(value: str) -> Optional[str]:
+    """Get a UTC ISO 8601 string in its 'Z'-suffixed form (None for other offsets)"""
+    if value.endswith('Z'):
+        return value
+    if value.endswith('+00:00'):
+        return value[:-6] + 'Z'
+    return None
+
+def _iso_date_prefix(value: Union[str, datetime]) -> str:
+    """Get the YYYY-MM-DD day of an ISO 8601 string or datetime"""
+    # ISO strings already start with the day, so slice instead of parsing
+    if isinstance(value, str):
+        if len(value) >= 10 and value[4] == '-' and value[7] == '-':
+            return value[:10]
+        value = _parse_iso(value)
+    return value.strftime("%Y-%m-%d")
+
 class SortDirection(Enum):
     """Enum for sort direction"""
     ASCENDING = "asc"
@@ -32,6 +125,13 @@ class GroupingMethod(Enum):
     BY_USER = "user"
     BY_TIER = "tier"
 
+# Conversion fields that the plain per-field grouping methods group on
+_GROUP_FIELDS = {
+    GroupingMethod.BY_STATUS: "status",
+    GroupingMethod.BY_USER: "user_id",
+    GroupingMethod.BY_TIER: "user_tier",
+}
+
 class DataSorter:
     """Utility class for sorting and organizing data"""
 
@@ -43,13 +143,13 @@ class DataSorter:
         algorithm: SortAlgorithm = SortAlgorithm.QUICK_SORT
     ) -> List[Dict[str, Any]]:
         """
-        Sort a list of conversions using the specified algorithm
+        Sort a list of conversions (missing values are placed last)
         
         Args:
             conversions: List of conversion dictionaries to sort
-            sort_by: Key to sort by
+            sort_by: Key to sort by (dotted for nested keys, e.g. 'user.name')
             direction: Sort direction (ascending or descending)
-            algorithm: Sorting algorithm to use
+            algorithm: Ignored; kept for backwards compatibility
             
         Returns:
             List of sorted conversions
@@ -57,23 +157,35 @@ class DataSorter:
         if not conversions:
             return []
         
-        # Clone the list to avoid modifying the original
-        result = conversions.copy()
-        
-        # Select the sorting algorithm
-        if algorithm == SortAlgorithm.QUICK_SORT:
-            sorted_result = DataSorter._quick_sort(result, sort_by, direction)
-        elif algorithm == SortAlgorithm.MERGE_SORT:
-            sorted_result = DataSorter._merge_sort(result, sort_by, direction)
-        elif algorithm == SortAlgorithm.HEAP_SORT:
-            sorted_result = DataSorter._heap_sort(result, sort_by, direction)
-        elif algorithm == SortAlgorithm.INSERTION_SORT:
-            sorted_result = DataSorter._insertion_sort(result, sort_by, direction)
+        # Built-in Timsort runs comparisons in C and fetches each key only once,
+        # so the algorithm argument is kept for API compatibility only
+        global _algorithm_notice_logged
+        if algorithm != SortAlgorithm.QUICK_SORT and not _algorithm_notice_logged:
+            logger.info(f"Sorting algorithm {algorithm} is ignored; conversions are sorted with Timsort")
+            _algorithm_notice_logged = True
+        
+        descending = direction == SortDirection.DESCENDING
+        
+        get_value = _compile_key(sort_by)
+        
+        # Large sorts on integer fields (e.g. file sizes) are ordered with NumPy
+        if len(conversions) >= _NUMPY_SORT_THRESHOLD:
+            order = _argsort_int_values(list(map(get_value, conversions)), descending)
+            if order is not None:
+                return [conversions[i] for i in order]
+        
+        # Pair each value with a None flag so missing values sort last in
+        # either direction instead of raising TypeError
+        if descending:
+            def key(item):
+                value = get_value(item)
+                return (value is not None, value)
         else:
-            logger.warning(f"Unknown sorting algorithm: {algorithm}, falling back to quick sort")
-            sorted_result = DataSorter._quick_sort(result, sort_by, direction)
+            def key(item):
+                value = get_value(item)
+                return (value is None, value)
         
-        return sorted_result
+        return sorted(conversions, key=key, reverse=descending)
     
     @staticmethod
     def group_conversions(
@@ -93,102 +205,96 @@ class DataSorter:
         if not conversions:
             return {}
         
-        grouped = {}
+        grouped = defaultdict(list)
         
         if group_by == GroupingMethod.BY_DATE:
             # Group by date (day)
             for conversion in conversions:
-                if "created_at" in conversion and conversion["created_at"]:
-                    # Parse the date string to datetime
-                    if isinstance(conversion["created_at"], str):
-                        date = datetime.fromisoformat(conversion["created_at"].replace('Z', '+00:00'))
-                    else:
-                        date = conversion["created_at"]
-                    
-                    # Format as string
-                    date_str = date.strftime("%Y-%m-%d")
-                    
-                    if date_str not in grouped:
-                        grouped[date_str] = []
-                    
-                    grouped[date_str].append(conversion)
+                created_at = conversion.get("created_at")
+                if created_at:
+                    grouped[_iso_date_prefix(created_at)].append(conversion)
                 else:
                     # Handle missing date
-                    if "Unknown" not in grouped:
-                        grouped["Unknown"] = []
                     grouped["Unknown"].append(conversion)
             
         elif group_by == GroupingMethod.BY_FORMAT:
             # Group by source and target format
             for conversion in conversions:
                 format_key = f"{conversion.get('source_format', 'unknown')} to {conversion.get('target_format', 'unknown')}"
-                
-                if format_key not in grouped:
-                    grouped[format_key] = []
-                
                 grouped[format_key].append(conversion)
                 
         elif group_by == GroupingMethod.BY_SIZE:
             # Group by file size ranges
-            size_ranges = {
-                "0-1MB": (0, 1 * 1024 * 1024),
-                "1-10MB": (1 * 1024 * 1024, 10 * 1024 * 1024),
-                "10-50MB": (10 * 1024 * 1024, 50 * 1024 * 1024),
-                "50-100MB": (50 * 1024 * 1024, 100 * 1024 * 1024),
-                "100MB+": (100 * 1024 * 1024, float('inf'))
-            }
-            
             for conversion in conversions:
                 # Get file size if available
                 file_size = DataSorter._get_file_size(conversion)
                 
-                # Find the appropriate range
-                size_range = "Unknown"
-                for range_name, (min_size, max_size) in size_ranges.items():
-                    if min_size <= file_size < max_size:
-                        size_range = range_name
-                        break
-                
-                if size_range not in grouped:
-                    grouped[size_range] = []
+                # Find the appropriate range with a binary search over the boundaries
+                if file_size < 0:
+                    size_range = "Unknown"
+                else:
+                    size_range = _SIZE_LABELS[bisect.bisect_right(_SIZE_BREAKS, file_size)]
                 
                 grouped[size_range].append(conversion)
                 
-        elif group_by == GroupingMethod.BY_STATUS:
-            # Group by conversion status
+        elif group_by in _GROUP_FIELDS:
+            # Group by status, user ID or tier (the tier requires user information
+            # to be included in the conversion)
+            field = _GROUP_FIELDS[group_by]
             for conversion in conversions:
-                status = conversion.get("status", "unknown")
-                
-                if status not in grouped:
-                    grouped[status] = []
-                
-                grouped[status].append(conversion)
-                
-        elif group_by == GroupingMethod.BY_USER:
-            # Group by user ID
-            for conversion in conversions:
-                user_id = conversion.get("user_id", "unknown")
-                
-                if user_id not in grouped:
-                    grouped[user_id] = []
-                
-                grouped[user_id].append(conversion)
-                
-        elif group_by == GroupingMethod.BY_TIER:
-            # This requires user information to be included in the conversion
-            for conversion in conversions:
-                tier = conversion.get("user_tier", "unknown")
-                
-                if tier not in grouped:
-                    grouped[tier] = []
-                
-                grouped[tier].append(conversion)
+                grouped[conversion.get(field, "unknown")].append(conversion)
         
         else:
             # Fallback: no grouping, just return everything in a single group
             grouped["all"] = conversions
         
-        return grouped
+        return dict(grouped)
+    
+    @staticmethod
+    def count_conversions(
+        conversions: List[Dict[str, Any]],
+        group_by: GroupingMethod
+    ) -> Dict[str, int]:
+        """
+        Count conversions per group without building the groups
+        
+        Args:
+            conversions: List of conversions to count
+            group_by: Grouping method to use
+            
+        Returns:
+            Dictionary with the same keys as group_conversions and counts as values
+        """
+        if not conversions:
+            return {}
+        
+        if group_by == GroupingMethod.BY_DATE:
+            counts = Counter(
+                _iso_date_prefix(created_at) if created_at else "Unknown"
+                for created_at in map(operator.methodcaller('get', 'created_at'), conversions)
+            )
+        
+        elif group_by == GroupingMethod.BY_FORMAT:
+            counts = Counter(
+                f"{conversion.get('source_format', 'unknown')} to {conversion.get('target_format', 'unknown')}"
+                for conversion in conversions
+            )
+        
+        elif group_by == GroupingMethod.BY_SIZE:
+            counts = Counter(
+                "Unknown" if file_size < 0 else _SIZE_LABELS[bisect.bisect_right(_SIZE_BREAKS, file_size)]
+                for file_size in map(DataSorter._get_file_size, conversions)
+            )
+        
+        elif group_by in _GROUP_FIELDS:
+            field = _GROUP_FIELDS[group_by]
+            counts = Counter(conversion.get(field, "unknown") for conversion in conversions)
+        
+        else:
+            # Fallback: no grouping, everything counts towards a single group
+            return {"all": len(conversions)}
+        
+        return dict(counts)
     
     @staticmethod
     def filter_conversions(
@@ -208,55 +314,60 @@ class DataSorter:
         if not conversions or not filters:
             return conversions
         
-        result = conversions.copy()
+        # Compile every criterion into a per-item predicate, then filter in one pass
+        predicates = []
         
         for key, value in filters.items():
             # Handle special case for date ranges
             if key == "date_range" and isinstance(value, dict):
-                start = value.get("start")
-                end = value.get("end")
-                
-                if start or end:
-                    result = DataSorter._filter_by_date_range(result, start, end)
-                continue
+                predicate = DataSorter._date_range_predicate(value.get("start"), value.get("end"))
             
             # Handle special case for search string (looks in multiple fields)
-            if key == "search":
-                result = DataSorter._filter_by_search_term(result, value)
-                continue
+            elif key == "search":
+                predicate = DataSorter._search_predicate(value)
             
             # Handle special case for size ranges
-            if key == "size_range" and isinstance(value, dict):
-                min_size = value.get("min")
-                max_size = value.get("max")
-                
-                if min_size is not None or max_size is not None:
-                    result = DataSorter._filter_by_size_range(result, min_size, max_size)
-                continue
+            elif key == "size_range" and isinstance(value, dict):
+                predicate = DataSorter._size_range_predicate(value.get("min"), value.get("max"))
             
             # Standard field filtering
-            result = [item for item in result if DataSorter._matches_filter(item, key, value)]
+            else:
+                predicate = DataSorter._field_predicate(key, value)
+            
+            if predicate is not None:
+                predicates.append(predicate)
         
-        return result
+        if not predicates:
+            return conversions
+        
+        return [item for item in conversions if all(predicate(item) for predicate in predicates)]
     
     @staticmethod
     def paginate_results(
-        items: List[Dict[str, Any]],
+        items: Iterable[Dict[str, Any]],
         page: int = 1,
-        per_page: int = 10
+        per_page: int = 10,
+        total: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Paginate results
         
         Args:
-            items: List of items to paginate
+            items: List of items to paginate, or any iterable (e.g. a generator or
+                query result), which is only consumed up to the requested page
             page: Page number (starting from 1)
             per_page: Items per page
+            total: Total number of items, for iterables without a length; when
+                omitted, "total" and "total_pages" are None in the result
             
         Returns:
             Dictionary with pagination info and items
         """
-        if not items:
+        sized = hasattr(items, '__len__')
+        if sized:
+            total = len(items)
+        
+        if total == 0:
             return {
                 "items": [],
                 "page": page,
@@ -272,19 +383,24 @@ class DataSorter:
         if per_page < 1:
             per_page = 10
         
-        total = len(items)
-        total_pages = (total + per_page - 1) // per_page  # Ceiling division
-        
-        # Adjust page if it's out of range
-        if page > total_pages:
-            page = total_pages
+        if total is not None:
+            total_pages = -(-total // per_page)  # Ceiling division
+            
+            # Adjust page if it's out of range
+            if page > total_pages:
+                page = total_pages
+        else:
+            total_pages = None
         
         # Calculate start and end indices
         start_idx = (page - 1) * per_page
-        end_idx = min(start_idx + per_page, total)
+        end_idx = start_idx + per_page
         
-        # Get items for the current page
-        paged_items = items[start_idx:end_idx]
+        # Get items for the current page; islice stops reading once the page is filled
+        if sized:
+            paged_items = items[start_idx:end_idx]
+        else:
+            paged_items = list(islice(items, start_idx, end_idx))
         
         return {
             "items": paged_items,
@@ -324,8 +440,9 @@ class DataSorter:
             return stats
         
         total_size = 0
-        total_processing_time = 0
         processing_times = []
+        formats = defaultdict(int)
+        conversions_by_date = defaultdict(int)
         
         for conversion in conversions:
             # Count successful/failed conversions
@@ -336,62 +453,43 @@ class DataSorter:
                 stats["failed_conversions"] += 1
             
             # Count formats
-            source_format = conversion.get("source_format", "unknown")
-            target_format = conversion.get("target_format", "unknown")
-            format_key = f"{source_format} to {target_format}"
-            
-            if format_key not in stats["formats"]:
-                stats["formats"][format_key] = 0
-            stats["formats"][format_key] += 1
+            formats[f"{conversion.get('source_format', 'unknown')} to {conversion.get('target_format', 'unknown')}"] += 1
             
             # Calculate total size
-            size = DataSorter._get_file_size(conversion)
-            total_size += size
+            total_size += DataSorter._get_file_size(conversion)
             
-            # Count by date
+            # Count by date (created_at is parsed once and reused below)
             created_at = conversion.get("created_at")
-            if created_at:
-                if isinstance(created_at, str):
-                    date = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                else:
-                    date = created_at
-                
-                date_str = date.strftime("%Y-%m-%d")
-                
-                if date_str not in stats["conversions_by_date"]:
-                    stats["conversions_by_date"][date_str] = 0
-                stats["conversions_by_date"][date_str] += 1
+            if not created_at:
+                continue
+            
+            if isinstance(created_at, str):
+                created_at = _parse_iso(created_at)
+            
+            conversions_by_date[created_at.strftime("%Y-%m-%d")] += 1
             
             # Calculate processing time
-            if conversion.get("completed_at") and conversion.get("created_at"):
+            completed_at = conversion.get("completed_at")
+            if completed_at:
                 try:
-                    if isinstance(conversion["completed_at"], str):
-                        completed_at = datetime.fromisoformat(conversion["completed_at"].replace('Z', '+00:00'))
-                    else:
-                        completed_at = conversion["completed_at"]
-                    
-                    if isinstance(conversion["created_at"], str):
-                        created_at = datetime.fromisoformat(conversion["created_at"].replace('Z', '+00:00'))
-                    else:
-                        created_at = conversion["created_at"]
+                    if isinstance(completed_at, str):
+                        completed_at = _parse_iso(completed_at)
                     
                     # Calculate time difference in seconds
-                    time_diff = (completed_at - created_at).total_seconds()
-                    processing_times.append(time_diff)
-                    total_processing_time += time_diff
-                    
-                    # Update min/max
-                    stats["processing_time"]["max"] = max(stats["processing_time"]["max"], time_diff)
-                    stats["processing_time"]["min"] = min(stats["processing_time"]["min"], time_diff)
+                    processing_times.append((completed_at - created_at).total_seconds())
                 except (ValueError, TypeError) as e:
                     logger.warning(f"Error calculating processing time: {e}")
         
+        stats["formats"] = dict(formats)
+        stats["conversions_by_date"] = dict(conversions_by_date)
+        
         # Calculate averages
-        if stats["total_conversions"] > 0:
-            stats["average_size"] = total_size / stats["total_conversions"]
+        stats["average_size"] = total_size / stats["total_conversions"]
         
         if processing_times:
-            stats["processing_time"]["average"] = total_processing_time / len(processing_times)
+            stats["processing_time"]["average"] = statistics.fmean(processing_times)
+            stats["processing_time"]["max"] = max(processing_times)
+            stats["processing_time"]["min"] = min(processing_times)
         else:
             stats["processing_time"]["min"] = 0
         
@@ -400,361 +498,169 @@ class DataSorter:
     # Private helper methods
     
     @staticmethod
-    def _quick_sort(items: List[Dict[str, Any]], sort_by: str, direction: SortDirection) -> List[Dict[str, Any]]:
-        """Quick sort implementation"""
-        if len(items) <= 1:
-            return items
-        
-        # Implementation of quicksort
-        def _partition(arr, low, high):
-            # Select pivot (middle element)
-            pivot_idx = (low + high) // 2
-            pivot = DataSorter._get_sort_value(arr[pivot_idx], sort_by)
-            
-            # Move pivot to the end
-            arr[pivot_idx], arr[high] = arr[high], arr[pivot_idx]
-            
-            # Partition around pivot
-            i = low - 1
-            for j in range(low, high):
-                curr_val = DataSorter._get_sort_value(arr[j], sort_by)
-                
-                # Compare based on direction
-                if (direction == SortDirection.ASCENDING and curr_val <= pivot) or \
-                   (direction == SortDirection.DESCENDING and curr_val >= pivot):
-                    i += 1
-                    arr[i], arr[j] = arr[j], arr[i]
-            
-            # Move pivot to its final position
-            arr[i + 1], arr[high] = arr[high], arr[i + 1]
-            return i + 1
-        
-        def _quick_sort_recursive(arr, low, high):
-            if low < high:
-                # Partition and get pivot index
-                pivot_idx = _partition(arr, low, high)
-                
-                # Recursively sort the subarrays
-                _quick_sort_recursive(arr, low, pivot_idx - 1)
-                _quick_sort_recursive(arr, pivot_idx + 1, high)
-        
-        # Make a copy to avoid modifying original
-        result = items.copy()
-        
-        # Sort the copy
-        _quick_sort_recursive(result, 0, len(result) - 1)
-        
-        return result
-    
-    @staticmethod
-    def _merge_sort(items: List[Dict[str, Any]], sort_by: str, direction: SortDirection) -> List[Dict[str, Any]]:
-        """Merge sort implementation"""
-        if len(items) <= 1:
-            return items
-        
-        # Make a copy to avoid modifying original
-        result = items.copy()
-        
-        def _merge(arr, temp, left, mid, right):
-            # Copy data to temp arrays
-            for i in range(left, right + 1):
-                temp[i] = arr[i]
-            
-            i = left  # Initial index of first subarray
-            j = mid + 1  # Initial index of second subarray
-            k = left  # Initial index of merged subarray
-            
-            # Merge the temp arrays back
-            while i <= mid and j <= right:
-                val_i = DataSorter._get_sort_value(temp[i], sort_by)
-                val_j = DataSorter._get_sort_value(temp[j], sort_by)
-                
-                # Compare based on direction
-                if (direction == SortDirection.ASCENDING and val_i <= val_j) or \
-                   (direction == SortDirection.DESCENDING and val_i >= val_j):
-                    arr[k] = temp[i]
-                    i += 1
-                else:
-                    arr[k] = temp[j]
-                    j += 1
-                k += 1
-            
-            # Copy the remaining elements
-            while i <= mid:
-                arr[k] = temp[i]
-                i += 1
-                k += 1
-            
-            while j <= right:
-                arr[k] = temp[j]
-                j += 1
-                k += 1
-        
-        def _merge_sort_recursive(arr, temp, left, right):
-            if left < right:
-                mid = (left + right) // 2
-                
-                # Sort first and second halves
-                _merge_sort_recursive(arr, temp, left, mid)
-                _merge_sort_recursive(arr, temp, mid + 1, right)
-                
-                # Merge the sorted halves
-                _merge(arr, temp, left, mid, right)
-        
-        # Create a temporary array
-        temp = [None] * len(result)
-        
-        # Sort
-        _merge_sort_recursive(result, temp, 0, len(result) - 1)
-        
-        return result
-    
-    @staticmethod
-    def _heap_sort(items: List[Dict[str, Any]], sort_by: str, direction: SortDirection) -> List[Dict[str, Any]]:
-        """Heap sort implementation"""
-        if len(items) <= 1:
-            return items
-        
-        # Make a copy to avoid modifying original
-        result = items.copy()
-        n = len(result)
-        
-        # Build a max/min heap based on direction
-        for i in range(n // 2 - 1, -1, -1):
-            DataSorter._heapify(result, n, i, sort_by, direction)
-        
-        # Extract elements from heap one by one
-        for i in range(n - 1, 0, -1):
-            result[0], result[i] = result[i], result[0]  # Swap
-            
-            # Heapify the reduced heap
-            DataSorter._heapify(result, i, 0, sort_by, direction)
-        
-        return result
-    
-    @staticmethod
-    def _heapify(arr, n, i, sort_by, direction):
-        """Heapify a subtree rooted at index i"""
-        largest = i  # Initialize largest as root
-        left = 2 * i + 1
-        right = 2 * i + 2
-        
-        # Compare left child with root
-        if left < n:
-            root_val = DataSorter._get_sort_value(arr[largest], sort_by)
-            left_val = DataSorter._get_sort_value(arr[left], sort_by)
-            
-            if (direction == SortDirection.ASCENDING and left_val > root_val) or \
-               (direction == SortDirection.DESCENDING and left_val < root_val):
-                largest = left
-        
-        # Compare right child with largest so far
-        if right < n:
-            largest_val = DataSorter._get_sort_value(arr[largest], sort_by)
-            right_val = DataSorter._get_sort_value(arr[right], sort_by)
-            
-            if (direction == SortDirection.ASCENDING and right_val > largest_val) or \
-               (direction == SortDirection.DESCENDING and right_val < largest_val):
-                largest = right
-        
-        # Change root if needed
-        if largest != i:
-            arr[i], arr[largest] = arr[largest], arr[i]  # Swap
-            
-            # Recursively heapify the affected sub-tree
-            DataSorter._heapify(arr, n, largest, sort_by, direction)
-    
-    @staticmethod
-    def _insertion_sort(items: List[Dict[str, Any]], sort_by: str, direction: SortDirection) -> List[Dict[str, Any]]:
-        """Insertion sort implementation"""
-        if len(items) <= 1:
-            return items
-        
-        # Make a copy to avoid modifying original
-        result = items.copy()
-        
-        # Traverse through 1 to len(result)
-        for i in range(1, len(result)):
-            key = result[i]
-            key_val = DataSorter._get_sort_value(key, sort_by)
-            
-            # Move elements greater than key to one position ahead
-            j = i - 1
-            while j >= 0:
-                curr_val = DataSorter._get_sort_value(result[j], sort_by)
-                
-                # Compare based on direction
-                if (direction == SortDirection.ASCENDING and curr_val > key_val) or \
-                   (direction == SortDirection.DESCENDING and curr_val < key_val):
-                    result[j + 1] = result[j]
-                    j -= 1
-                else:
-                    break
-            
-            result[j + 1] = key
-        
-        return result
-    
-    @staticmethod
-    def _get_sort_value(item: Dict[str, Any], key: str) -> Any:
-        """Extract the value to sort by from the item"""
-        # Handle nested keys (e.g., 'user.name')
-        if '.' in key:
-            parts = key.split('.')
-            value = item
-            
-            for part in parts:
-                if isinstance(value, dict) and part in value:
-                    value = value[part]
-                else:
-                    return None
-            
-            return value
-        
-        # Handle regular keys
-        return item.get(key)
-    
-    @staticmethod
-    def _filter_by_date_range(
-        items: List[Dict[str, Any]],
+    def _date_range_predicate(
         start_date: Optional[Union[str, datetime]],
         end_date: Optional[Union[str, datetime]]
-    ) -> List[Dict[str, Any]]:
-        """Filter items by date range"""
+    ) -> Optional[Callable[[Dict[str, Any]], bool]]:
+        """Build a predicate matching items created within a date range (None if unbounded)"""
         if not start_date and not end_date:
-            return items
+            return None
         
-        result = []
+        # UTC ISO strings of the same shape order chronologically as plain strings,
+        # so matching items can be compared without parsing them
+        start_key = _utc_iso_string(start_date) if isinstance(start_date, str) else None
+        end_key = _utc_iso_string(end_date) if isinstance(end_date, str) else None
         
         # Convert string dates to datetime objects
         if start_date and isinstance(start_date, str):
             try:
-                start_date = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
+                start_date = _parse_iso(start_date)
             except ValueError:
                 logger.warning(f"Invalid start date format: {start_date}")
-                start_date = None
+                start_date = start_key = None
         
         if end_date and isinstance(end_date, str):
             try:
-                end_date = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+                end_date = _parse_iso(end_date)
             except ValueError:
                 logger.warning(f"Invalid end date format: {end_date}")
-                end_date = None
-        
-        # Filter items
-        for item in items:
+                end_date = end_key = None
+        
+        # Only take the string path when every remaining bound is a UTC string of one shape
+        shapes = {key.translate(_ISO_DIGITS) for key in (start_key, end_key) if key}
+        string_bounds = (
+            len(shapes) == 1
+            and (start_key is not None or not start_date)
+            and (end_key is not None or not end_date)
+        )
+        shape = shapes.pop() if string_bounds else None
+        
+        def predicate(item):
             created_at = item.get("created_at")
             
             if not created_at:
-                continue
+                return False
+            
+            if shape is not None and isinstance(created_at, str):
+                item_key = _utc_iso_string(created_at)
+                if item_key is not None and item_key.translate(_ISO_DIGITS) == shape:
+                    if start_key and item_key < start_key:
+                        return False
+                    
+                    if end_key and item_key > end_key:
+                        return False
+                    
+                    return True
             
             # Convert string date to datetime
             if isinstance(created_at, str):
                 try:
-                    item_date = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+                    item_date = _parse_iso(created_at)
                 except ValueError:
                     logger.warning(f"Invalid date format in item: {created_at}")
-                    continue
+                    return False
             else:
                 item_date = created_at
             
             # Check if the item is within the date range
             if start_date and item_date < start_date:
-                continue
+                return False
             
             if end_date and item_date > end_date:
-                continue
+                return False
             
-            result.append(item)
+            return True
         
-        return result
+        return predicate
     
     @staticmethod
-    def _filter_by_search_term(items: List[Dict[str, Any]], search_term: str) -> List[Dict[str, Any]]:
-        """Filter items by search term (searches multiple fields)"""
+    def _search_predicate(search_term: str) -> Optional[Callable[[Dict[str, Any]], bool]]:
+        """Build a predicate matching items whose text fields contain a search term"""
         if not search_term:
-            return items
+            return None
         
-        search_term = search_term.lower()
-        result = []
+        lc = search_term.lower()
         
-        # Fields to search in
-        search_fields = ["source_filename", "target_filename", "source_format", "target_format", "status"]
-        
-        for item in items:
+        def predicate(item):
             # Check if any field contains the search term
-            for field in search_fields:
-                value = item.get(field)
-                
-                if value and isinstance(value, str) and search_term in value.lower():
-                    result.append(item)
-                    break
+            return any(
+                isinstance(value, str) and lc in value.lower()
+                for value in map(item.get, _SEARCH_FIELDS) if value
+            )
         
-        return result
+        return predicate
     
     @staticmethod
-    def _filter_by_size_range(
-        items: List[Dict[str, Any]],
+    def _size_range_predicate(
         min_size: Optional[int],
         max_size: Optional[int]
-    ) -> List[Dict[str, Any]]:
-        """Filter items by file size range"""
+    ) -> Optional[Callable[[Dict[str, Any]], bool]]:
+        """Build a predicate matching items within a file size range (None if unbounded)"""
         if min_size is None and max_size is None:
-            return items
-        
-        result = []
+            return None
         
-        for item in items:
+        def predicate(item):
             size = DataSorter._get_file_size(item)
             
             # Check if the size is within the range
             if min_size is not None and size < min_size:
-                continue
+                return False
             
             if max_size is not None and size > max_size:
-                continue
+                return False
             
-            result.append(item)
+            return True
         
-        return result
+        return predicate
     
     @staticmethod
-    def _matches_filter(item: Dict[str, Any], key: str, value: Any) -> bool:
-        """Check if an item matches a specific filter"""
-        # Handle nested keys (e.g., 'user.name')
+    def _field_predicate(key: str, value: Any) -> Callable[[Dict[str, Any]], bool]:
+        """Build a predicate matching items whose field equals (or, for lists, contains) a value"""
+        # Handle nested keys (e.g., 'user.name'); the key is split only once
         if '.' in key:
             parts = key.split('.')
-            current = item
-            
-            for part in parts[:-1]:
-                if isinstance(current, dict) and part in current:
-                    current = current[part]
-                else:
-                    return False
+            path, final_key = parts[:-1], parts[-1]
             
-            # Check the final key
-            final_key = parts[-1]
-            if isinstance(current, dict) and final_key in current:
-                return current[final_key] == value
+            def predicate(item):
+                current = item
+                
+                for part in path:
+                    if isinstance(current, dict) and part in current:
+                        current = current[part]
+                    else:
+                        return False
+                
+                # Check the final key
+                if isinstance(current, dict) and final_key in current:
+                    return current[final_key] == value
+                
+                return False
             
-            return False
+            return predicate
         
         # Handle regular keys
-        item_value = item.get(key)
-        
-        # Handle lists (check if value is in the list)
-        if isinstance(item_value, list):
-            return value in item_value
+        def predicate(item):
+            item_value = item.get(key)
+            
+            # Handle lists (check if value is in the list)
+            if isinstance(item_value, list):
+                return value in item_value
+            
+            # Handle regular equality check
+            return item_value == value
         
-        # Handle regular equality check
-        return item_value == value
+        return predicate
     
     @staticmethod
     def _get_file_size(item: Dict[str, Any]) -> int:
         """Extract file size from an item"""
-        # Try to get file size from different possible fields
-        for field in ["file_size", "source_file_size", "size"]:
-            if field in item and item[field] is not None:
-                return int(item[field])
-        
-        return 0 
\ No newline at end of file
+        # Try to get file size from different possible fields, most common first
+        size = item.get("file_size")
+        if size is None:
+            size = item.get("source_file_size")
+            if size is None:
+                size = item.get("size")
+                if size is None:
+                    return 0
+        
+        return size if type(size) is int else int(size) 
\ No newline at end of file
@@ -1,26 +1,95 @@
 import os
+import threading
 import uuid
 import logging
-from datetime import datetime, timedelta
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from sqlalchemy import or_, select, update
 from werkzeug.utils import secure_filename
-from flask import current_app
+from flask import current_app, has_request_context, request
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Number of expired conversions handled per cleanup batch
+CLEANUP_BATCH_SIZE = 1000
+# Threads used to delete the files of a cleanup batch
+CLEANUP_DELETE_WORKERS = 32
+
+# MIME types by file format (extension)
+_MIME_TYPES = {
+    # Documents
+    'pdf': 'application/pdf',
+    'doc': 'application/msword',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'txt': 'text/plain',
+    'html': 'text/html',
+    'htm': 'text/html',
+    'rtf': 'application/rtf',
+    
+    # Spreadsheets
+    'csv': 'text/csv',
+    'xls': 'application/vnd.ms-excel',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    
+    # Data formats
+    'json': 'application/json',
+    'xml': 'application/xml',
+    'yaml': 'application/x-yaml',
+    'yml': 'application/x-yaml',
+    
+    # Images
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+    'gif': 'image/gif',
+    'bmp': 'image/bmp',
+    'webp': 'image/webp',
+    'tiff': 'image/tiff',
+    'tif': 'image/tiff',
+    'svg': 'image/svg+xml',
+    
+    # Audio
+    'mp3': 'audio/mpeg',
+    'wav': 'audio/wav',
+    'ogg': 'audio/ogg',
+    'flac': 'audio/flac',
+    'aac': 'audio/aac',
+    'm4a': 'audio/mp4',
+    
+    # Video
+    'mp4': 'video/mp4',
+    'avi': 'video/x-msvideo',
+    'mov': 'video/quicktime',
+    'mkv': 'video/x-matroska',
+    'webm': 'video/webm',
+    'wmv': 'video/x-ms-wmv',
+}
+
+_DEFAULT_MIME = 'application/octet-stream'
+
+# Timestamp embedded in generated filenames
+_TIMESTAMP_FORMAT = '%Y%m%d%H%M%S'
+
+# Upload subfolders already created by get_upload_path
+_created_dirs = set()
+_created_dirs_lock = threading.Lock()
+
 def allowed_file(filename, allowed_extensions):
     """
     Check if a file has an allowed extension
     
     Args:
         filename (str): Filename to check
-        allowed_extensions (list): List of allowed extensions
+        allowed_extensions (set): Allowed extensions (any container works, but
+            a set or frozenset makes the check a single hash lookup)
         
     Returns:
         bool: True if file has an allowed extension, False otherwise
     """
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in allowed_extensions
+    ext = get_file_extension(filename)
+    return ext is not None and ext in allowed_extensions
 
 def get_file_extension(filename):
     """
@@ -32,8 +101,10 @@ def get_file_extension(filename):
     Returns:
         str: File extension without dot
     """
-    if '.' in filename:
-        return filename.rsplit('.', 1)[1].lower()
+    # rpartition scans once from the right without building a list
+    _, dot, ext = filename.rpartition('.')
+    if dot:
+        return ext.lower()
     return None
 
 def generate_unique_filename(filename, extension=None):
@@ -47,29 +118,19 @@ def generate_unique_filename(filename, extension=None):
     Returns:
         str: Unique filename
     """
-    # Get base filename without extension
-    if '.' in filename:
-        name, ext = filename.rsplit('.', 1)
-    else:
-        name = filename
-        ext = ''
+    # Get base filename without extension (a single scan from the right)
+    name, dot, ext = filename.rpartition('.')
+    if not dot:
+        name, ext = filename, ''
     
     # Use provided extension if available
     if extension:
         ext = extension
     
-    # Generate a UUID to ensure uniqueness
-    unique_id = uuid.uuid4().hex[:8]
-    
-    # Secure the filename to ensure it doesn't contain unsafe characters
-    secure_name = secure_filename(name)
-    
-    # Combine with timestamp and UUID for uniqueness
-    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-    if ext:
-        return f"{secure_name}_{timestamp}_{unique_id}.{ext}"
-    else:
-        return f"{secure_name}_{timestamp}_{unique_id}"
+    # Secure the filename and combine it with a timestamp and a short UUID
+    # for uniqueness
+    unique_name = f"{secure_filename(name)}_{datetime.now().strftime(_TIMESTAMP_FORMAT)}_{uuid.uuid4().hex[:8]}"
+    return f"{unique_name}.{ext}" if ext else unique_name
 
 def get_upload_path(filename, subfolder=None):
     """
@@ -87,8 +148,10 @@ def get_upload_path(filename, subfolder=None):
     # If subfolder provided, create if it doesn't exist
     if subfolder:
         subfolder_path = os.path.join(upload_folder, subfolder)
-        if not os.path.exists(subfolder_path):
+        if subfolder_path not in _created_dirs:
             os.makedirs(subfolder_path, exist_ok=True)
+            with _created_dirs_lock:
+                _created_dirs.add(subfolder_path)
         return os.path.join(subfolder_path, filename)
     
     return os.path.join(upload_folder, filename)
@@ -103,11 +166,25 @@ def validate_file_size(file):
     Returns:
         bool: True if file is within the allowed size, False otherwise
     """
+    max_size = current_app.config['MAX_CONTENT_LENGTH']
+    
+    # The whole request body bounds the size of any file in it, so a small
+    # enough request needs no further checks
+    if has_request_context():
+        request_size = request.content_length
+        if request_size is not None and request_size <= max_size:
+            return True
+    
+    # A part that declares itself too large can be rejected outright; a smaller
+    # declared size is client-supplied, so it is not trusted
+    if getattr(file, 'content_length', 0) > max_size:
+        return False
+    
     file.seek(0, os.SEEK_END)
     file_size = file.tell()
     file.seek(0)  # Reset file pointer
     
-    return file_size <= current_app.config['MAX_CONTENT_LENGTH']
+    return file_size <= max_size
 
 def get_mimetype_for_format(format_name):
     """
@@ -119,56 +196,60 @@ def get_mimetype_for_format(format_name):
     Returns:
         str: MIME type for the format
     """
-    mime_types = {
-        # Documents
-        'pdf': 'application/pdf',
-        'doc': 'application/msword',
-        'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        'txt': 'text/plain',
-        'html': 'text/html',
-        'htm': 'text/html',
-        'rtf': 'application/rtf',
-        
-        # Spreadsheets
-        'csv': 'text/csv',
-        'xls': 'application/vnd.ms-excel',
-        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        
-        # Data formats
-        'json': 'application/json',
-        'xml': 'application/xml',
-        'yaml': 'application/x-yaml',
-        'yml': 'application/x-yaml',
-        
-        # Images
-        'jpg': 'image/jpeg',
-        'jpeg': 'image/jpeg',
-        'png': 'image/png',
-        'gif': 'image/gif',
-        'bmp': 'image/bmp',
-        'webp': 'image/webp',
-        'tiff': 'image/tiff',
-        'tif': 'image/tiff',
-        'svg': 'image/svg+xml',
-        
-        # Audio
-        'mp3': 'audio/mpeg',
-        'wav': 'audio/wav',
-        'ogg': 'audio/ogg',
-        'flac': 'audio/flac',
-        'aac': 'audio/aac',
-        'm4a': 'audio/mp4',
+    # Formats are almost always lowercase already, so only lowercase on a miss
+    mime_type = _MIME_TYPES.get(format_name)
+    if mime_type is None:
+        mime_type = _MIME_TYPES.get(format_name.lower(), _DEFAULT_MIME)
+    return mime_type
+
+def _safe_unlink(path):
+    """
+    Delete a file, treating an already missing file as nothing to do
+    
+    Returns:
+        tuple: (files deleted, errors) as 0/1 counts
+    """
+    try:
+        os.unlink(path)
+        return 1, 0
+    except FileNotFoundError:
+        return 0, 0
+    except OSError as e:
+        logger.error(f"Error deleting file {path}: {str(e)}")
+        return 0, 1
+
+def _existing_paths(paths):
+    """
+    Filter paths down to files that currently exist
+    
+    Each directory is listed once with os.scandir instead of stat-ing every path,
+    which matters when many of the files are already gone.
+    
+    Args:
+        paths (list): File paths to check
         
-        # Video
-        'mp4': 'video/mp4',
-        'avi': 'video/x-msvideo',
-        'mov': 'video/quicktime',
-        'mkv': 'video/x-matroska',
-        'webm': 'video/webm',
-        'wmv': 'video/x-ms-wmv',
-    }
-    
-    return mime_types.get(format_name.lower(), 'application/octet-stream')
+    Returns:
+        list: The paths whose file exists
+    """
+    paths_by_dir = defaultdict(list)
+    for path in paths:
+        paths_by_dir[os.path.dirname(path)].append(path)
+    
+    existing = []
+    for directory, dir_paths in paths_by_dir.items():
+        try:
+            with os.scandir(directory or '.') as entries:
+                names = {entry.name for entry in entries}
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            # Unlisted directory: leave the files to the unlink attempt
+            logger.warning(f"Could not list {directory}: {str(e)}")
+            existing.extend(dir_paths)
+            continue
+        existing.extend(path for path in dir_paths if os.path.basename(path) in names)
+    
+    return existing
 
 def cleanup_expired_files():
     """
@@ -178,49 +259,67 @@ def cleanup_expired_files():
     """
     try:
         logger.info("Starting cleanup of expired files")
-        upload_folder = current_app.config['UPLOAD_FOLDER']
-        expiry_days = current_app.config.get('FILE_EXPIRY_DAYS', 7)
-        expiry_date = datetime.now() - timedelta(days=expiry_days)
         
-        # Get all conversions from the database
         from app.models.conversion import Conversion
+        from app.models.db import db
         
-        # Find expired conversions
-        expired_conversions = Conversion.query.filter(
-            Conversion.expires_at < datetime.utcnow()
-        ).all()
-        
+        now = datetime.utcnow()
         deleted_count = 0
         errors = 0
+        last_id = 0
         
-        for conversion in expired_conversions:
-            # Delete source file
-            try:
-                if conversion.source_file_path and os.path.exists(conversion.source_file_path):
-                    os.remove(conversion.source_file_path)
-                    deleted_count += 1
-            except Exception as e:
-                logger.error(f"Error deleting source file {conversion.source_file_path}: {str(e)}")
-                errors += 1
-            
-            # Delete target file
-            try:
-                if conversion.target_file_path and os.path.exists(conversion.target_file_path):
-                    os.remove(conversion.target_file_path)
-                    deleted_count += 1
-            except Exception as e:
-                logger.error(f"Error deleting target file {conversion.target_file_path}: {str(e)}")
-                errors += 1
-            
-            # Mark conversion as expired in database
-            conversion.status = 'expired'
-        
-        # Commit changes to database
-        from app.models.db import db
-        db.session.commit()
+        # Walk the conversions that expired but are not yet marked as such in id
+        # order, one batch at a time, loading only the columns needed, so memory
+        # stays bounded on large tables
+        with ThreadPoolExecutor(max_workers=CLEANUP_DELETE_WORKERS) as executor:
+            while True:
+                batch = db.session.execute(
+                    select(Conversion.id, Conversion.source_file_path, Conversion.target_file_path)
+                    .where(
+                        Conversion.expires_at < now,
+                        # Spelled like the ix_conv_expires_pending predicate so
+                        # the planner can use that partial index
+                        or_(Conversion.status.is_(None), Conversion.status != 'expired'),
+                        Conversion.id > last_id
+                    )
+                    .order_by(Conversion.id)
+                    .limit(CLEANUP_BATCH_SIZE)
+                ).all()
+                if not batch:
+                    break
+                
+                # Mark the whole batch as expired with a single UPDATE and commit it
+                # before touching any files, so slow storage never holds the
+                # transaction (and its row locks) open
+                batch_ids = [conversion.id for conversion in batch]
+                db.session.execute(
+                    update(Conversion)
+                    .where(Conversion.id.in_(batch_ids))
+                    .values(status='expired')
+                    .execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+                last_id = batch_ids[-1]
+                
+                paths = [
+                    path
+                    for conversion in batch
+                    for path in (conversion.source_file_path, conversion.target_file_path)
+                    if path
+                ]
+                
+                # Conversion files always live in the local upload folder (routes
+                # save them via get_upload_path, never through a storage handler),
+                # so delete them concurrently from disk, skipping files already gone
+                for deleted, failed in executor.map(_safe_unlink, _existing_paths(paths)):
+                    deleted_count += deleted
+                    errors += failed
         
         logger.info(f"Cleanup completed: {deleted_count} files deleted, {errors} errors")
         return deleted_count, errors
     except Exception as e:
         logger.error(f"Error during file cleanup: {str(e)}")
+        # Earlier batches are already committed; only the failed batch is discarded
+        from app.models.db import db
+        db.session.rollback()
         return 0, 1 
\ No newline at end of file
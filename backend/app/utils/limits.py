@@ -0,0 +1,146 @@
+"""
+Usage limit utility module.
+Tracks per-user conversions over a rolling 24 hour window in Redis so limit
+checks avoid a SQL count.
+"""
+
+import time
+from datetime import timezone
+from app.utils.redis_client import get_redis_client
+
+# Length of the rolling window (and TTL of idle users' keys), in seconds
+DAILY_WINDOW = 86400
+
+# Member marking a window that has been seeded from the database; its infinite
+# score keeps it out of the trim, so it is never counted as a conversion
+_SEED_MEMBER = 'seed'
+
+# Trim entries older than the window, optionally record a new one, and
+# return the number of entries left - all in a single atomic round-trip.
+# Returns -1 without recording anything if the window was never seeded (new
+# user, expired key, or Redis restarted), so the caller can rebuild it
+_ROLLING_WINDOW_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+if redis.call('EXISTS', key) == 0 then
+    return -1
+end
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+if ARGV[3] then
+    redis.call('ZADD', key, now, ARGV[3])
+    redis.call('EXPIRE', key, window)
+end
+return redis.call('ZCARD', key) - 1
+"""
+
+# Seed a missing window with the given (score, member) pairs, unless another
+# caller seeded it first
+_SEED_WINDOW_LUA = """
+local key = KEYS[1]
+if redis.call('EXISTS', key) == 1 then
+    return 0
+end
+redis.call('ZADD', key, 'inf', ARGV[2])
+for i = 3, #ARGV, 2 do
+    redis.call('ZADD', key, ARGV[i], ARGV[i + 1])
+end
+redis.call('EXPIRE', key, ARGV[1])
+return 1
+"""
+
+_rolling_window_script = None
+
+def _get_rolling_window_script():
+    """
+    Get the registered rolling window script
+    
+    The script is invoked with EVALSHA; redis-py loads it with SCRIPT LOAD
+    on first use and again if the server's script cache was flushed.
+    """
+    global _rolling_window_script
+    
+    if _rolling_window_script is None:
+        _rolling_window_script = get_redis_client().register_script(_ROLLING_WINDOW_LUA)
+    
+    return _rolling_window_script
+
+_seed_window_script = None
+
+def _get_seed_window_script():
+    """Get the registered window seeding script"""
+    global _seed_window_script
+    
+    if _seed_window_script is None:
+        _seed_window_script = get_redis_client().register_script(_SEED_WINDOW_LUA)
+    
+    return _seed_window_script
+
+def _daily_key(user_id):
+    """Build the Redis key holding a user's recent conversions"""
+    return f"user:{user_id}:conv"
+
+def incr_daily(user_id, conversion_id):
+    """
+    Record a conversion in a user's rolling 24 hour window
+    
+    Call this when the conversion is created. Nothing is recorded if the
+    window has not been seeded yet; the next get_daily returns None and the
+    window is then rebuilt from the database, which includes this conversion.
+    
+    Args:
+        user_id: ID of the user
+        conversion_id: ID of the conversion, used as the set member so
+            the same conversion is not counted twice
+        
+    Returns:
+        int: Number of conversions in the window, including this one, or
+            None if the window has not been seeded
+        
+    Raises:
+        redis.RedisError: If Redis is unreachable
+    """
+    script = _get_rolling_window_script()
+    count = script(keys=[_daily_key(user_id)], args=[time.time(), DAILY_WINDOW, conversion_id])
+    return None if count < 0 else count
+
+def get_daily(user_id):
+    """
+    Get the number of conversions a user made in the last 24 hours
+    
+    Args:
+        user_id: ID of the user
+        
+    Returns:
+        int: Number of conversions in the window, or None if the window has
+            not been seeded (see seed_daily)
+        
+    Raises:
+        redis.RedisError: If Redis is unreachable
+    """
+    script = _get_rolling_window_script()
+    count = script(keys=[_daily_key(user_id)], args=[time.time(), DAILY_WINDOW])
+    return None if count < 0 else count
+
+def seed_daily(user_id, conversions):
+    """
+    Build a user's rolling window from their recent conversions
+    
+    Does nothing if the window already exists, so concurrent callers do not
+    overwrite conversions recorded in the meantime.
+    
+    Args:
+        user_id: ID of the user
+        conversions: (conversion_id, created_at) pairs from the last 24 hours,
+            with created_at as a naive UTC datetime
+        
+    Raises:
+        redis.RedisError: If Redis is unreachable
+    """
+    args = [DAILY_WINDOW, _SEED_MEMBER]
+    for conversion_id, created_at in conversions:
+        args.append(created_at.replace(tzinfo=timezone.utc).timestamp())
+        args.append(conversion_id)
+    
+    script = _get_seed_window_script()
+    script(keys=[_daily_key(user_id)], args=args)
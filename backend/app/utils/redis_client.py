@@ -0,0 +1,54 @@
+"""
+Redis client utility module.
+Provides a shared, lazily created Redis connection for caches and counters.
+"""
+
+import logging
+import time
+import redis
+from app.config import Config
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+_redis_client = None
+
+# After a Redis error, callers skip Redis for this many seconds and go straight
+# to their fallback instead of each waiting out the connect timeout
+REDIS_RETRY_INTERVAL = 30
+
+# Monotonic time until which Redis is considered unavailable
+_unavailable_until = 0.0
+
+def get_redis_client():
+    """
+    Get the process-wide Redis client, creating it on first use
+    
+    Returns:
+        redis.Redis: Redis client backed by a shared connection pool
+    """
+    global _redis_client
+    
+    if _redis_client is None:
+        # Short timeouts so callers can fall back to the database quickly
+        _redis_client = redis.Redis.from_url(
+            Config.REDIS_URL,
+            socket_timeout=1,
+            socket_connect_timeout=1
+        )
+    
+    return _redis_client
+
+def redis_available():
+    """
+    Check whether Redis should be tried, i.e. no error was reported recently
+    
+    Returns:
+        bool: False while the circuit opened by mark_redis_unavailable lasts
+    """
+    return time.monotonic() >= _unavailable_until
+
+def mark_redis_unavailable():
+    """Skip Redis for REDIS_RETRY_INTERVAL seconds after an error"""
+    global _unavailable_until
+    _unavailable_until = time.monotonic() + REDIS_RETRY_INTERVAL
@@ -4,12 +4,17 @@ Supports local filesystem, AWS S3, Google Cloud Storage, and Azure Blob Storage.
 """
 
 import os
+import errno
 import logging
 import shutil
+import threading
 import uuid
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError
+from google.api_core.exceptions import GoogleAPICallError, NotFound
 from google.cloud import storage as gcloud_storage
 from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPermissions
 from io import BytesIO
@@ -19,6 +24,26 @@ from app.config import Config
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Buffer size used when streaming file-like objects to disk
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Current day and its YYYY-MM-DD string, replaced as a whole once the day changes
+_today_cache = (None, None)
+
+def _today_str():
+    """Get today's date as YYYY-MM-DD, formatting it only once per day"""
+    global _today_cache
+    today = date.today()
+    cached_day, cached_str = _today_cache
+    if cached_day != today:
+        cached_str = today.isoformat()
+        _today_cache = (today, cached_str)
+    return cached_str
+
+# Storage handlers already created, by storage type
+_handlers = {}
+_handlers_lock = threading.Lock()
+
 class StorageFactory:
     """Factory for creating storage handlers based on configuration"""
     
@@ -31,24 +56,27 @@ class StorageFactory:
             storage_type: Type of storage ('local', 's3', 'gcs', 'azure')
             
         Returns:
-            StorageHandler: Instance of the appropriate storage handler
+            StorageHandler: Shared instance of the appropriate storage handler
         """
         if not storage_type:
             storage_type = os.environ.get('STORAGE_TYPE', 'local')
             
         storage_type = storage_type.lower()
         
-        if storage_type == 'local':
-            return LocalStorageHandler()
-        elif storage_type == 's3':
-            return S3StorageHandler()
-        elif storage_type == 'gcs':
-            return GCSStorageHandler()
-        elif storage_type == 'azure':
-            return AzureStorageHandler()
-        else:
+        if storage_type not in _HANDLER_CLASSES:
             logger.warning(f"Unknown storage type: {storage_type}, falling back to local storage")
-            return LocalStorageHandler()
+            storage_type = 'local'
+        
+        # Handlers and their SDK clients are thread-safe and costly to build,
+        # so one instance per storage type is shared by the whole process
+        handler = _handlers.get(storage_type)
+        if handler is None:
+            with _handlers_lock:
+                handler = _handlers.get(storage_type)
+                if handler is None:
+                    handler = _HANDLER_CLASSES[storage_type]()
+                    _handlers[storage_type] = handler
+        return handler
 
 class BaseStorageHandler:
     """Base class for all storage handlers"""
@@ -67,6 +95,25 @@ class BaseStorageHandler:
         """
         raise NotImplementedError("Subclasses must implement save_file method")
     
+    def save_fd(self, src_fd, filename, directory=None):
+        """
+        Save the whole contents of an open file descriptor to storage
+        
+        The default implementation reads the descriptor through a file object;
+        handlers that can copy between descriptors directly should override it.
+        
+        Args:
+            src_fd: Open file descriptor to read from (left open; its offset may move)
+            filename: Name to save the file as
+            directory: Directory path within the storage (optional)
+            
+        Returns:
+            str: URL or path to the stored file
+        """
+        with os.fdopen(os.dup(src_fd), 'rb') as file_obj:
+            file_obj.seek(0)
+            return self.save_file(file_obj, filename, directory)
+    
     def get_file(self, file_path):
         """
         Get a file from storage
@@ -75,7 +122,8 @@ class BaseStorageHandler:
             file_path: Path or URL to the file
             
         Returns:
-            BytesIO: File-like object containing the file data
+            File-like binary object containing the file data (a BytesIO, or for
+            local storage the open file itself), which the caller should close
         """
         raise NotImplementedError("Subclasses must implement get_file method")
     
@@ -91,6 +139,20 @@ class BaseStorageHandler:
         """
         raise NotImplementedError("Subclasses must implement delete_file method")
     
+    def delete_files(self, file_paths):
+        """
+        Delete multiple files from storage
+        
+        Subclasses backed by a bulk-delete API should override this.
+        
+        Args:
+            file_paths: Iterable of paths or URLs to the files
+            
+        Returns:
+            int: Number of files deleted
+        """
+        return sum(1 for file_path in file_paths if self.delete_file(file_path))
+    
     def get_file_url(self, file_path, expiry=None):
         """
         Get a URL for accessing the file
@@ -110,10 +172,15 @@ class LocalStorageHandler(BaseStorageHandler):
     def __init__(self):
         """Initialize the local storage handler"""
         self.base_dir = os.environ.get('UPLOAD_DIR', Config.UPLOAD_DIR)
-        self.base_url = os.environ.get('UPLOAD_URL', '/uploads')
+        # Normalized once so get_file_url never produces a double slash
+        self.base_url = os.environ.get('UPLOAD_URL', '/uploads').rstrip('/')
         
         # Ensure the directory exists
         os.makedirs(self.base_dir, exist_ok=True)
+        
+        # Directories already created by save_file, so they are made only once
+        self._created_dirs = set()
+        self._dirs_lock = threading.Lock()
     
     def save_file(self, file_obj, filename=None, directory=None):
         """Save a file to the local filesystem"""
@@ -123,62 +190,98 @@ class LocalStorageHandler(BaseStorageHandler):
             else:
                 filename = f"{uuid.uuid4()}"
         
-        # Create subdirectory based on date
-        if not directory:
-            today = datetime.now().strftime('%Y-%m-%d')
-            directory = os.path.join(self.base_dir, today)
-        else:
-            directory = os.path.join(self.base_dir, directory)
-        
-        # Ensure directory exists
-        os.makedirs(directory, exist_ok=True)
-        
         # Full path to save file
-        file_path = os.path.join(directory, filename)
+        file_path = os.path.join(self._ensure_directory(directory), filename)
         
         # Save the file
         if hasattr(file_obj, 'save'):
             # If it's a werkzeug file object
             file_obj.save(file_path)
         elif hasattr(file_obj, 'read'):
-            # If it's a file-like object
+            # If it's a file-like object, stream it in 1 MiB chunks
             with open(file_path, 'wb') as f:
-                f.write(file_obj.read())
+                shutil.copyfileobj(file_obj, f, length=COPY_CHUNK_SIZE)
         elif isinstance(file_obj, str) and os.path.exists(file_obj):
-            # If it's a path to a file
-            shutil.copy(file_obj, file_path)
+            # If it's a path to a file (copyfile copies in-kernel where supported
+            # and skips copying permission bits)
+            shutil.copyfile(file_obj, file_path)
         else:
             raise ValueError("Invalid file object provided")
         
         # Return relative path from base_dir
         return os.path.relpath(file_path, self.base_dir)
     
+    def save_fd(self, src_fd, filename, directory=None):
+        """Save the contents of an open file descriptor, copied in-kernel with sendfile"""
+        file_path = os.path.join(self._ensure_directory(directory), filename)
+        size = os.fstat(src_fd).st_size
+        
+        dst_fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            offset = 0
+            try:
+                while offset < size:
+                    sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                    if not sent:
+                        break
+                    offset += sent
+            except (AttributeError, OSError) as e:
+                # sendfile is unavailable or cannot write to regular files on
+                # this platform; copy the remainder through user space instead
+                if isinstance(e, OSError) and e.errno not in (errno.EINVAL, errno.ENOSYS, errno.ENOTSOCK):
+                    raise
+                while offset < size:
+                    chunk = os.pread(src_fd, COPY_CHUNK_SIZE, offset)
+                    if not chunk:
+                        break
+                    os.write(dst_fd, chunk)
+                    offset += len(chunk)
+        finally:
+            os.close(dst_fd)
+        
+        # Return relative path from base_dir
+        return os.path.relpath(file_path, self.base_dir)
+    
+    def _ensure_directory(self, directory=None):
+        """Resolve a save directory (today's date by default) and create it once"""
+        # Create subdirectory based on date
+        if not directory:
+            today = _today_str()
+            directory = os.path.join(self.base_dir, today)
+        else:
+            directory = os.path.join(self.base_dir, directory)
+        
+        # Ensure directory exists
+        if directory not in self._created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            with self._dirs_lock:
+                self._created_dirs.add(directory)
+        
+        return directory
+    
     def get_file(self, file_path):
         """Get a file from the local filesystem"""
         full_path = os.path.join(self.base_dir, file_path)
         
-        if not os.path.exists(full_path):
+        # Hand back the open file so it is streamed rather than read into memory;
+        # open directly instead of checking for existence first
+        try:
+            return open(full_path, 'rb')
+        except FileNotFoundError:
             logger.error(f"File not found: {full_path}")
             return None
-        
-        file_data = BytesIO()
-        with open(full_path, 'rb') as f:
-            file_data.write(f.read())
-        
-        file_data.seek(0)
-        return file_data
     
     def delete_file(self, file_path):
         """Delete a file from the local filesystem"""
         full_path = os.path.join(self.base_dir, file_path)
         
-        if not os.path.exists(full_path):
-            logger.warning(f"File not found for deletion: {full_path}")
-            return False
-        
+        # Unlink directly instead of checking for existence first
         try:
-            os.remove(full_path)
+            os.unlink(full_path)
             return True
+        except FileNotFoundError:
+            logger.warning(f"File not found for deletion: {full_path}")
+            return False
         except Exception as e:
             logger.error(f"Error deleting file {full_path}: {str(e)}")
             return False
@@ -186,11 +289,28 @@ class LocalStorageHandler(BaseStorageHandler):
     def get_file_url(self, file_path, expiry=None):
         """Get URL for a file in the local filesystem"""
         # For local storage, we just return a relative URL
-        return f"{self.base_url}/{file_path}"
+        return f"{self.base_url}/{file_path.lstrip('/')}"
 
 class S3StorageHandler(BaseStorageHandler):
     """Handler for AWS S3 storage"""
     
+    # Maximum number of keys accepted by a single DeleteObjects request
+    DELETE_BATCH_SIZE = 1000
+    
+    # Connection pool sized for concurrent requests on the shared client
+    CLIENT_CONFIG = BotoConfig(
+        max_pool_connections=64,
+        tcp_keepalive=True,
+        retries={'max_attempts': 3, 'mode': 'adaptive'}
+    )
+    
+    # Large uploads are sent as parallel 16 MiB multipart chunks
+    TRANSFER_CONFIG = TransferConfig(
+        multipart_threshold=16 * 1024 * 1024,
+        multipart_chunksize=16 * 1024 * 1024,
+        use_threads=True
+    )
+    
     def __init__(self):
         """Initialize the S3 storage handler"""
         self.bucket_name = os.environ.get('S3_BUCKET_NAME', 'file-converter')
@@ -202,7 +322,8 @@ class S3StorageHandler(BaseStorageHandler):
             's3',
             aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID'),
             aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY'),
-            region_name=self.region
+            region_name=self.region,
+            config=self.CLIENT_CONFIG
         )
     
     def save_file(self, file_obj, filename=None, directory=None):
@@ -215,7 +336,7 @@ class S3StorageHandler(BaseStorageHandler):
         
         # Create key based on directory and date
         if not directory:
-            today = datetime.now().strftime('%Y-%m-%d')
+            today = _today_str()
             key = f"{self.base_prefix}/{today}/{filename}"
         else:
             key = f"{self.base_prefix}/{directory}/{filename}"
@@ -227,10 +348,10 @@ class S3StorageHandler(BaseStorageHandler):
         try:
             if hasattr(file_obj, 'read'):
                 # If it's a file-like object
-                self.s3.upload_fileobj(file_obj, self.bucket_name, key)
+                self.s3.upload_fileobj(file_obj, self.bucket_name, key, Config=self.TRANSFER_CONFIG)
             elif isinstance(file_obj, str) and os.path.exists(file_obj):
                 # If it's a path to a file
-                self.s3.upload_file(file_obj, self.bucket_name, key)
+                self.s3.upload_file(file_obj, self.bucket_name, key, Config=self.TRANSFER_CONFIG)
             else:
                 raise ValueError("Invalid file object provided")
             
@@ -259,6 +380,27 @@ class S3StorageHandler(BaseStorageHandler):
             logger.error(f"Error deleting from S3: {str(e)}")
             return False
     
+    def delete_files(self, file_paths):
+        """Delete multiple files from S3 using batched DeleteObjects requests"""
+        file_paths = list(file_paths)
+        deleted_count = 0
+        
+        for start in range(0, len(file_paths), self.DELETE_BATCH_SIZE):
+            chunk = file_paths[start:start + self.DELETE_BATCH_SIZE]
+            try:
+                response = self.s3.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={'Objects': [{'Key': key} for key in chunk], 'Quiet': True}
+                )
+                errors = response.get('Errors', [])
+                for error in errors:
+                    logger.error(f"Error deleting {error.get('Key')} from S3: {error.get('Message')}")
+                deleted_count += len(chunk) - len(errors)
+            except ClientError as e:
+                logger.error(f"Error batch deleting from S3: {str(e)}")
+        
+        return deleted_count
+    
     def get_file_url(self, file_path, expiry=None):
         """Get a presigned URL for a file in S3"""
         if not expiry:
@@ -281,6 +423,9 @@ class S3StorageHandler(BaseStorageHandler):
 class GCSStorageHandler(BaseStorageHandler):
     """Handler for Google Cloud Storage"""
     
+    # Maximum number of calls accepted by a single JSON API batch request
+    DELETE_BATCH_SIZE = 100
+    
     def __init__(self):
         """Initialize the GCS storage handler"""
         self.bucket_name = os.environ.get('GCS_BUCKET_NAME', 'file-converter')
@@ -300,7 +445,7 @@ class GCSStorageHandler(BaseStorageHandler):
         
         # Create blob name based on directory and date
         if not directory:
-            today = datetime.now().strftime('%Y-%m-%d')
+            today = _today_str()
             blob_name = f"{self.base_prefix}/{today}/{filename}"
         else:
             blob_name = f"{self.base_prefix}/{directory}/{filename}"
@@ -351,6 +496,40 @@ class GCSStorageHandler(BaseStorageHandler):
             logger.error(f"Error deleting from GCS: {str(e)}")
             return False
     
+    def delete_files(self, file_paths):
+        """Delete multiple files from GCS using batched requests"""
+        file_paths = list(file_paths)
+        deleted_count = 0
+        
+        for start in range(0, len(file_paths), self.DELETE_BATCH_SIZE):
+            chunk = file_paths[start:start + self.DELETE_BATCH_SIZE]
+            try:
+                # Deletes issued inside the batch context are sent as one request on exit
+                with self.client.batch():
+                    for file_path in chunk:
+                        self.bucket.blob(file_path).delete()
+                deleted_count += len(chunk)
+                continue
+            except GoogleAPICallError as e:
+                logger.warning(f"Batch delete from GCS failed, retrying files one by one: {str(e)}")
+            except Exception as e:
+                logger.error(f"Error batch deleting from GCS: {str(e)}")
+                continue
+            
+            # Some call in the batch failed; deletes are idempotent, so resend each
+            # one on its own to count exactly which files could not be deleted
+            for file_path in chunk:
+                try:
+                    self.bucket.blob(file_path).delete()
+                    deleted_count += 1
+                except NotFound:
+                    # Already gone, possibly deleted by the batch itself
+                    deleted_count += 1
+                except Exception as e:
+                    logger.error(f"Error deleting {file_path} from GCS: {str(e)}")
+        
+        return deleted_count
+    
     def get_file_url(self, file_path, expiry=None):
         """Get a signed URL for a file in GCS"""
         blob = self.bucket.blob(file_path)
@@ -371,6 +550,9 @@ class GCSStorageHandler(BaseStorageHandler):
 class AzureStorageHandler(BaseStorageHandler):
     """Handler for Azure Blob Storage"""
     
+    # Maximum number of sub-requests accepted by a single blob batch request
+    DELETE_BATCH_SIZE = 256
+    
     def __init__(self):
         """Initialize the Azure storage handler"""
         connection_string = os.environ.get('AZURE_STORAGE_CONNECTION_STRING')
@@ -399,7 +581,7 @@ class AzureStorageHandler(BaseStorageHandler):
         
         # Create blob name based on directory and date
         if not directory:
-            today = datetime.now().strftime('%Y-%m-%d')
+            today = _today_str()
             blob_name = f"{self.base_prefix}/{today}/{filename}"
         else:
             blob_name = f"{self.base_prefix}/{directory}/{filename}"
@@ -433,8 +615,9 @@ class AzureStorageHandler(BaseStorageHandler):
         file_data = BytesIO()
         
         try:
+            # Write the download chunk by chunk instead of buffering it in full first
             download_stream = blob_client.download_blob()
-            file_data.write(download_stream.readall())
+            download_stream.readinto(file_data)
             file_data.seek(0)
             return file_data
         except Exception as e:
@@ -452,6 +635,26 @@ class AzureStorageHandler(BaseStorageHandler):
             logger.error(f"Error deleting from Azure: {str(e)}")
             return False
     
+    def delete_files(self, file_paths):
+        """Delete multiple files from Azure Blob Storage using blob batch requests"""
+        file_paths = list(file_paths)
+        deleted_count = 0
+        
+        for start in range(0, len(file_paths), self.DELETE_BATCH_SIZE):
+            chunk = file_paths[start:start + self.DELETE_BATCH_SIZE]
+            try:
+                responses = self.container_client.delete_blobs(*chunk, raise_on_any_failure=False)
+                for file_path, response in zip(chunk, responses):
+                    # A blob that is already gone (404) needs no deleting
+                    if response.status_code in (202, 404):
+                        deleted_count += 1
+                    else:
+                        logger.error(f"Error deleting {file_path} from Azure: HTTP {response.status_code}")
+            except Exception as e:
+                logger.error(f"Error batch deleting from Azure: {str(e)}")
+        
+        return deleted_count
+    
     def get_file_url(self, file_path, expiry=None):
         """Get a SAS URL for a file in Azure Blob Storage"""
         blob_client = self.container_client.get_blob_client(file_path)
@@ -475,4 +678,12 @@ class AzureStorageHandler(BaseStorageHandler):
             return url
         except Exception as e:
             logger.error(f"Error generating Azure URL: {str(e)}")
-            return None 
\ No newline at end of file
+            return None
+
+# Handler class for each supported storage type
+_HANDLER_CLASSES = {
+    'local': LocalStorageHandler,
+    's3': S3StorageHandler,
+    'gcs': GCSStorageHandler,
+    'azure': AzureStorageHandler,
+}
\ No newline at end of file